@@ -0,0 +1,59 @@
+"""Articles full text search
+
+Revision ID: 8dad3eab0b22
+Revises: 08b1b3d0a689
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8dad3eab0b22'
+down_revision: Union[str, None] = '08b1b3d0a689'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+search_config = (
+    "CASE WHEN lang = 'en' THEN 'english'::regconfig ELSE 'russian'::regconfig END"
+)
+
+search_vector_expression = " || ".join(
+    f"setweight(to_tsvector({search_config}, {column}), '{weight}')"
+    for column, weight in (
+        ('name', 'A'),
+        ('key_words', 'A'),
+        ('terminology', 'B'),
+        ('author', 'B'),
+        ('usage_context', 'C'),
+        ('solving', 'C'),
+    )
+)
+
+
+def upgrade() -> None:
+    op.add_column(
+        'articles',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(search_vector_expression, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_articles_search_vector',
+        'articles',
+        ['search_vector'],
+        unique=False,
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_articles_search_vector', table_name='articles')
+    op.drop_column('articles', 'search_vector')
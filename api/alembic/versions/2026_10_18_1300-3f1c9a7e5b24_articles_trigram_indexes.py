@@ -0,0 +1,42 @@
+"""Articles trigram indexes
+
+Revision ID: 3f1c9a7e5b24
+Revises: 8dad3eab0b22
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7e5b24'
+down_revision: Union[str, None] = '8dad3eab0b22'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_articles_name_trgm',
+        'articles',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_articles_author_trgm',
+        'articles',
+        ['author'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'author': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_articles_author_trgm', table_name='articles')
+    op.drop_index('ix_articles_name_trgm', table_name='articles')
@@ -0,0 +1,44 @@
+"""Indexes for hot filter and join columns
+
+Revision ID: e4b8f2a61c07
+Revises: 3f1c9a7e5b24
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b8f2a61c07'
+down_revision: Union[str, None] = '3f1c9a7e5b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_articles_user_id_id', 'articles', ['user_id', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_articles_term_id', 'articles', ['term', 'id'], unique=False
+    )
+    op.create_index(
+        'ix_articles_publication_year_id',
+        'articles',
+        ['publication_year', 'id'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_problems_article_id_id', 'problems', ['article_id', 'id'], unique=False
+    )
+    op.create_index('ix_problems_user_id', 'problems', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_problems_user_id', table_name='problems')
+    op.drop_index('ix_problems_article_id_id', table_name='problems')
+    op.drop_index('ix_articles_publication_year_id', table_name='articles')
+    op.drop_index('ix_articles_term_id', table_name='articles')
+    op.drop_index('ix_articles_user_id_id', table_name='articles')
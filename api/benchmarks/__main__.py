@@ -0,0 +1,136 @@
+import argparse
+import asyncio
+import datetime
+import platform
+import sys
+
+import httpx
+import orjson
+
+from benchmarks.corpus import reset_corpus, seed_corpus
+from benchmarks.load import SCENARIOS, run_load
+from benchmarks.serialization import run_serialization
+
+
+async def seed(args: argparse.Namespace) -> dict:
+    from models import db
+
+    try:
+        if args.reset:
+            await reset_corpus(db.session_factory)
+        return await seed_corpus(
+            db.session_factory,
+            users=args.users,
+            articles_per_user=args.articles_per_user,
+            problems_per_article=args.problems_per_article,
+            seed=args.seed,
+        )
+    finally:
+        await db.dispose()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    options = {
+        "scenarios": args.scenarios,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "max_requests": args.max_requests,
+        "warmup": args.warmup,
+        "seed": args.seed,
+    }
+
+    if args.base_url:
+        results = await run_load(None, args.base_url, **options)
+    else:
+        from main import app
+
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            results = await run_load(transport, "http://testserver", **options)
+
+    return {
+        "started_at": datetime.datetime.now(datetime.UTC).isoformat(),
+        "target": args.base_url or "in-process",
+        "python": platform.python_version(),
+        "options": options,
+        "scenarios": results,
+    }
+
+
+def serialization(args: argparse.Namespace) -> dict:
+    return {
+        "started_at": datetime.datetime.now(datetime.UTC).isoformat(),
+        "python": platform.python_version(),
+        "options": {
+            "problems": args.problems,
+            "articles": args.articles,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "cases": run_serialization(
+            args.problems, args.articles, args.repeat, args.seed
+        ),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Seed a synthetic corpus")
+    seed_parser.add_argument("--users", type=int, default=50)
+    seed_parser.add_argument("--articles-per-user", type=int, default=200)
+    seed_parser.add_argument("--problems-per-article", type=int, default=5)
+    seed_parser.add_argument("--seed", type=int, default=0)
+    seed_parser.add_argument(
+        "--reset", action="store_true", help="Delete a previously seeded corpus"
+    )
+
+    run_parser = commands.add_parser("run", help="Run HTTP load scenarios")
+    run_parser.add_argument(
+        "--base-url", help="Target a running server instead of the in-process app"
+    )
+    run_parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=list(SCENARIOS),
+        default=list(SCENARIOS),
+    )
+    run_parser.add_argument("--concurrency", type=int, default=10)
+    run_parser.add_argument("--duration", type=float, default=10.0)
+    run_parser.add_argument("--max-requests", type=int)
+    run_parser.add_argument("--warmup", type=float, default=2.0)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="Write the JSON report to a file")
+
+    serialization_parser = commands.add_parser(
+        "serialization", help="Time schema validation and response rendering"
+    )
+    serialization_parser.add_argument("--problems", type=int, default=500)
+    serialization_parser.add_argument("--articles", type=int, default=10000)
+    serialization_parser.add_argument("--repeat", type=int, default=20)
+    serialization_parser.add_argument("--seed", type=int, default=0)
+    serialization_parser.add_argument(
+        "--output", help="Write the JSON report to a file"
+    )
+
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if args.command == "serialization":
+        report = serialization(args)
+    else:
+        commands = {"seed": seed, "run": run}
+        report = asyncio.run(commands[args.command](args))
+    output = orjson.dumps(report, option=orjson.OPT_INDENT_2)
+
+    if getattr(args, "output", None):
+        with open(args.output, "wb") as file:
+            file.write(output)
+    sys.stdout.buffer.write(output + b"\n")
+
+
+if __name__ == "__main__":
+    main()
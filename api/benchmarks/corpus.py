@@ -0,0 +1,158 @@
+import random
+from typing import Dict, List
+
+import bcrypt
+from sqlalchemy import delete, insert, select
+
+from configs.config import settings
+from models import Article, Problem, User
+from models.article import LangEnum, TermRuTypeEnum
+
+EMAIL_TEMPLATE = "bench-{index}@bench.example.com"
+PASSWORD = "bench-password"
+
+WORDS = (
+    "digital",
+    "platform",
+    "transformation",
+    "network",
+    "analytics",
+    "model",
+    "industrial",
+    "cloud",
+    "quantum",
+    "robotics",
+    "security",
+    "logistics",
+    "energy",
+    "education",
+    "healthcare",
+    "sensor",
+    "цифровой",
+    "платформа",
+    "трансформация",
+    "сеть",
+    "аналитика",
+    "модель",
+    "промышленность",
+    "облако",
+    "робототехника",
+    "безопасность",
+)
+
+AUTHORS = (
+    "Ivanov I. I.",
+    "Petrova A. S.",
+    "Smith J.",
+    "Garcia M.",
+    "Kuznetsov D. V.",
+    "Chen L.",
+    "Sokolova E. N.",
+    "Müller K.",
+)
+
+
+def bench_email(index: int) -> str:
+    return EMAIL_TEMPLATE.format(index=index)
+
+
+def make_text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_article(rng: random.Random, index: int, user_id: int) -> Dict:
+    terms = list(TermRuTypeEnum)
+    langs = list(LangEnum)
+    return {
+        "name": f"Bench article {index}: {make_text(rng, 6)}",
+        "_term": terms[index % len(terms)],
+        "terminology": make_text(rng, 20),
+        "author": rng.choice(AUTHORS),
+        "key_words": ", ".join(rng.sample(WORDS, 5)),
+        "publication_year": rng.randint(1995, 2024),
+        "url": f"https://bench.example.com/articles/{index}",
+        "identifier": f"bench-{index}",
+        "usage_context": make_text(rng, 40),
+        "math_apparatus": make_text(rng, 15),
+        "solving": make_text(rng, 40),
+        "interests": make_text(rng, 10),
+        "lang": langs[(index // len(terms)) % len(langs)],
+        "user_id": user_id,
+    }
+
+
+async def reset_corpus(session_factory) -> None:
+    async with session_factory() as session:
+        user_ids = select(User.id).where(User.email.like("bench-%@bench.example.com"))
+        article_ids = select(Article.id).where(Article.user_id.in_(user_ids))
+        await session.execute(
+            delete(Problem).where(
+                Problem.user_id.in_(user_ids) | Problem.article_id.in_(article_ids)
+            )
+        )
+        await session.execute(delete(Article).where(Article.user_id.in_(user_ids)))
+        await session.execute(delete(User).where(User.id.in_(user_ids)))
+        await session.commit()
+
+
+async def seed_corpus(
+    session_factory,
+    users: int,
+    articles_per_user: int,
+    problems_per_article: int,
+    seed: int = 0,
+    batch_size: int = 1000,
+) -> Dict[str, int]:
+    rng = random.Random(seed)
+    hashed_password = bcrypt.hashpw(
+        PASSWORD.encode(), bcrypt.gensalt(settings.password_hashing.bcrypt_rounds)
+    )
+
+    async with session_factory() as session:
+        user_ids: List[int] = list(
+            await session.scalars(
+                insert(User).returning(User.id),
+                [
+                    {
+                        "email": bench_email(index),
+                        "name": f"Bench user {index}",
+                        "hashed_password": hashed_password,
+                    }
+                    for index in range(users)
+                ],
+            )
+        )
+
+        article_ids: List[int] = []
+        articles = [
+            make_article(rng, index, user_ids[index % users])
+            for index in range(users * articles_per_user)
+        ]
+        for start in range(0, len(articles), batch_size):
+            article_ids.extend(
+                await session.scalars(
+                    insert(Article).returning(Article.id),
+                    articles[start : start + batch_size],
+                )
+            )
+
+        problems = [
+            {
+                "text": make_text(rng, 8),
+                "is_solved": rng.random() < 0.3,
+                "article_id": article_id,
+                "user_id": rng.choice(user_ids),
+            }
+            for article_id in article_ids
+            for _ in range(problems_per_article)
+        ]
+        for start in range(0, len(problems), batch_size):
+            await session.execute(insert(Problem), problems[start : start + batch_size])
+
+        await session.commit()
+
+    return {
+        "users": len(user_ids),
+        "articles": len(article_ids),
+        "problems": len(problems),
+    }
@@ -0,0 +1,201 @@
+import asyncio
+import random
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.corpus import PASSWORD, WORDS, bench_email
+from models.article import TermEnTypeEnum, TermRuTypeEnum
+
+
+class VirtualUser:
+    def __init__(self, client: httpx.AsyncClient, index: int, seed: int) -> None:
+        self.client = client
+        self.index = index
+        self.rng = random.Random(seed * 100003 + index)
+        self.own_article_ids: List[int] = []
+        self.article_ids: List[int] = []
+
+    async def login(self) -> httpx.Response:
+        return await self.client.post(
+            "/auth/login",
+            json={"email": bench_email(self.index), "password": PASSWORD},
+        )
+
+    async def load_own_articles(self) -> None:
+        response = await self.client.get("/api/articles/my/", params={"limit": 200})
+        response.raise_for_status()
+        self.own_article_ids = [item["id"] for item in response.json()["items"]]
+
+    async def load_other_articles(self, article_ids: List[int]) -> None:
+        # Problems can only be reported on someone else's article, the author
+        # gets a 403.
+        response = await self.client.get("/api/articles/", params={"limit": 200})
+        response.raise_for_status()
+        own_article_ids = set(self.own_article_ids)
+        self.article_ids = sorted(
+            {item["id"] for item in response.json()["items"]}.union(article_ids)
+            - own_article_ids
+        )
+        if not self.article_ids:
+            raise RuntimeError(
+                f"no articles by other authors visible to {bench_email(self.index)}"
+            )
+
+
+def random_article_id(user: VirtualUser) -> int:
+    return user.rng.choice(user.article_ids)
+
+
+async def login_scenario(user: VirtualUser) -> httpx.Response:
+    return await user.login()
+
+
+async def search_scenario(user: VirtualUser) -> httpx.Response:
+    params = {}
+    choice = user.rng.random()
+    if choice < 0.3:
+        params["term"] = user.rng.choice(
+            list(TermRuTypeEnum) + list(TermEnTypeEnum)
+        ).value
+    elif choice < 0.6:
+        params["name"] = user.rng.choice(WORDS)
+    elif choice < 0.8:
+        params["q"] = user.rng.choice(WORDS)
+    return await user.client.get("/api/articles/", params=params)
+
+
+async def detail_scenario(user: VirtualUser) -> httpx.Response:
+    return await user.client.get(f"/api/articles/{random_article_id(user)}/")
+
+
+async def create_problem_scenario(user: VirtualUser) -> httpx.Response:
+    return await user.client.post(
+        f"/api/articles/{random_article_id(user)}/",
+        json={"problem": f"Bench problem {user.rng.randrange(10**9)}"},
+    )
+
+
+async def update_scenario(user: VirtualUser) -> httpx.Response:
+    article_id = user.rng.choice(user.own_article_ids)
+    response = await user.client.get(f"/api/articles/{article_id}/")
+    if response.status_code != 200:
+        return response
+
+    article = response.json()
+    article["problems"] = [
+        {"id": problem["id"], "is_solved": not problem["is_solved"]}
+        for problem in article["problems"]
+    ]
+    return await user.client.put(f"/api/articles/{article_id}/", json=article)
+
+
+SCENARIOS: Dict[str, Callable[[VirtualUser], Awaitable[httpx.Response]]] = {
+    "login": login_scenario,
+    "search": search_scenario,
+    "detail": detail_scenario,
+    "create_problem": create_problem_scenario,
+    "update": update_scenario,
+}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round(max(latencies, default=0.0) * 1000, 3),
+        },
+    }
+
+
+async def run_scenario(
+    users: List[VirtualUser],
+    scenario: Callable[[VirtualUser], Awaitable[httpx.Response]],
+    duration: float,
+    max_requests: Optional[int],
+) -> Dict:
+    latencies: List[float] = []
+    errors = 0
+    started_at = time.perf_counter()
+    deadline = started_at + duration
+
+    async def worker(user: VirtualUser) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            if max_requests is not None and len(latencies) + errors >= max_requests:
+                return
+
+            request_started_at = time.perf_counter()
+            try:
+                response = await scenario(user)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+
+            if failed:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - request_started_at)
+
+    await asyncio.gather(*(worker(user) for user in users))
+    return summarize(latencies, errors, time.perf_counter() - started_at)
+
+
+async def run_load(
+    transport: Optional[httpx.AsyncBaseTransport],
+    base_url: str,
+    scenarios: List[str],
+    concurrency: int,
+    duration: float,
+    max_requests: Optional[int],
+    warmup: float,
+    seed: int,
+) -> Dict:
+    clients = [
+        httpx.AsyncClient(transport=transport, base_url=base_url, timeout=30.0)
+        for _ in range(concurrency)
+    ]
+    users = [VirtualUser(client, index, seed) for index, client in enumerate(clients)]
+    try:
+        for user in users:
+            (await user.login()).raise_for_status()
+            await user.load_own_articles()
+            if not user.own_article_ids:
+                raise RuntimeError(
+                    f"{bench_email(user.index)} has no articles, seed the corpus first"
+                )
+
+        article_ids = [
+            article_id for user in users for article_id in user.own_article_ids
+        ]
+        for user in users:
+            await user.load_other_articles(article_ids)
+
+        results = {}
+        for name in scenarios:
+            if warmup:
+                await run_scenario(users, SCENARIOS[name], warmup, None)
+            results[name] = await run_scenario(
+                users, SCENARIOS[name], duration, max_requests
+            )
+        return results
+    finally:
+        for client in clients:
+            await client.aclose()
@@ -0,0 +1,142 @@
+import asyncio
+import datetime
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Type
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import BaseModel
+
+from benchmarks.corpus import make_article, make_text
+from models import Article, Problem, User
+from schemas.articles_schemas import (
+    ArticleShortPageSchema,
+    ArticleShortSchema,
+    ArticleWithProblemsSchema,
+)
+from schemas.auth_schemas import AuthResponse, UserSchema
+from utils.responses import PydanticResponse
+
+
+def make_orm_article(rng: random.Random, index: int, problems: int) -> Article:
+    article = Article(
+        id=index + 1,
+        created_at=datetime.datetime(2024, 1, 1),
+        updated_at=datetime.datetime(2024, 1, 1),
+        **make_article(rng, index, user_id=1),
+    )
+    article.problems = [
+        Problem(
+            id=index * problems + number + 1,
+            text=make_text(rng, 8),
+            is_solved=rng.random() < 0.3,
+            article_id=article.id,
+            user_id=1,
+        )
+        for number in range(problems)
+    ]
+    return article
+
+
+def make_orm_user() -> User:
+    return User(id=1, email="bench-0@bench.example.com", name="Bench user 0")
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    func()
+    timings: List[float] = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started_at)
+    return {
+        "repeat": repeat,
+        "min_ms": round(min(timings) * 1000, 4),
+        "median_ms": round(statistics.median(timings) * 1000, 4),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 4),
+    }
+
+
+def response_model_revalidation(
+    loop: asyncio.AbstractEventLoop, type_: Type, content: Any
+) -> Callable[[], Any]:
+    field = create_response_field(name="Response", type_=type_)
+
+    def run() -> Any:
+        return loop.run_until_complete(
+            serialize_response(field=field, response_content=content)
+        )
+
+    return run
+
+
+def stages(
+    loop: asyncio.AbstractEventLoop,
+    response_type: Type,
+    build: Callable[[], BaseModel],
+) -> Dict[str, Callable[[], Any]]:
+    model = build()
+    jsonable = jsonable_encoder(model)
+    return {
+        "model_validate": build,
+        "response_model_revalidation": response_model_revalidation(
+            loop, response_type, model
+        ),
+        "jsonable_encoder": lambda: jsonable_encoder(model),
+        "orjson_render": lambda: ORJSONResponse(jsonable).body,
+        "model_dump_json": lambda: model.model_dump_json(),
+        "pydantic_response_render": lambda: PydanticResponse(model).body,
+    }
+
+
+def cases(
+    loop: asyncio.AbstractEventLoop, problems: int, articles: int, seed: int
+) -> Dict[str, Dict]:
+    rng = random.Random(seed)
+    article = make_orm_article(rng, 0, problems)
+    short_articles = [make_orm_article(rng, index, 0) for index in range(articles)]
+    user = make_orm_user()
+
+    return {
+        f"article_with_{problems}_problems": stages(
+            loop,
+            ArticleWithProblemsSchema,
+            lambda: ArticleWithProblemsSchema.model_validate(article),
+        ),
+        f"page_of_{articles}_short_articles": stages(
+            loop,
+            ArticleShortPageSchema,
+            lambda: ArticleShortPageSchema(
+                items=[
+                    ArticleShortSchema.model_validate(item) for item in short_articles
+                ]
+            ),
+        ),
+        "user": stages(loop, UserSchema, lambda: UserSchema.model_validate(user)),
+        "auth_response": stages(
+            loop,
+            AuthResponse,
+            lambda: AuthResponse(
+                access_token="a" * 600,
+                refresh_token="r" * 600,
+                user=UserSchema.model_validate(user),
+            ),
+        ),
+    }
+
+
+def run_serialization(
+    problems: int, articles: int, repeat: int, seed: int
+) -> Dict[str, Dict]:
+    loop = asyncio.new_event_loop()
+    try:
+        return {
+            case: {stage: measure(func, repeat) for stage, func in case_stages.items()}
+            for case, case_stages in cases(loop, problems, articles, seed).items()
+        }
+    finally:
+        loop.close()
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Literal, Optional
 from pydantic import BaseModel, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -9,6 +9,26 @@ BASE_DIR = Path(__file__).parent.parent
 class DBSettings(BaseModel):
     url: PostgresDsn
     echo: bool = False
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100
+    prepared_statement_cache_size: int = 100
+    pgbouncer_transaction_mode: bool = False
+    n_plus_one_threshold: int = 5
+    slow_query_threshold_ms: Optional[float] = 500
+    slow_query_explain_sample_rate: float = 0.1
+    slow_query_explain_analyze: bool = True
+    slow_query_log_size: int = 100
+    replica_urls: List[PostgresDsn] = []
+    read_your_writes_seconds: float = 5.0
+    read_your_writes_size: int = 10000
+    replica_max_lag_seconds: float = 5.0
+    replica_retry_seconds: float = 10.0
+    replica_health_check_interval: float = 5.0
+    replica_health_check_timeout: float = 2.0
     naming_convention: Dict[str, str] = (
         {
             "ix": "ix_%(column_0_label)s",
@@ -26,6 +46,45 @@ class AuthJWT(BaseModel):
     algorithm: str = "RS256"
     access_token_expire_minutes: int = 30
     refresh_token_expire_minutes: int = 60
+    key_reload_interval_seconds: int = 60
+    verified_token_cache_size: int = 4096
+    stateless_identity: bool = False
+
+
+class AdminSettings(BaseModel):
+    emails: List[str] = []
+
+
+class PaginationSettings(BaseModel):
+    default_limit: int = 50
+    max_limit: int = 200
+
+
+class ImportSettings(BaseModel):
+    batch_size: int = 1000
+
+
+class ExportSettings(BaseModel):
+    yield_per: int = 1000
+
+
+class CacheSettings(BaseModel):
+    user_cache_size: int = 1024
+    user_cache_ttl_seconds: int = 30
+    article_cache_backend: Literal["none", "memory", "redis"] = "memory"
+    article_cache_size: int = 1024
+    article_cache_ttl_seconds: int = 300
+    redis_url: Optional[str] = None
+    search_coalescing: bool = True
+    search_result_ttl_seconds: float = 0.0
+    search_result_cache_size: int = 256
+
+
+class PasswordHashingSettings(BaseModel):
+    bcrypt_rounds: int = 12
+    workers: int = 4
+    max_pending: int = 64
+    use_processes: bool = False
 
 
 class Settings(BaseSettings):
@@ -37,6 +96,12 @@ class Settings(BaseSettings):
 
     jwt: AuthJWT = AuthJWT()
     db: DBSettings
+    admin: AdminSettings = AdminSettings()
+    pagination: PaginationSettings = PaginationSettings()
+    cache: CacheSettings = CacheSettings()
+    article_import: ImportSettings = ImportSettings()
+    article_export: ExportSettings = ExportSettings()
+    password_hashing: PasswordHashingSettings = PasswordHashingSettings()
 
 
 settings = Settings()
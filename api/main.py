@@ -1,20 +1,41 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
-from starlette.responses import FileResponse
+from starlette.responses import FileResponse, Response
 from starlette.staticfiles import StaticFiles
 
+from configs.config import settings
 from routers.auth_router import router as auth_router
 from routers.article_router import router as article_router
+from routers.admin_router import router as admin_router
 from models import db
+from services.article_service import article_cache, article_cache_stats, search_flight
+from services.metrics import (
+    MetricsMiddleware,
+    instrument_engine,
+    register_stats,
+    render_metrics,
+)
+from services.query_stats import QueryStatsMiddleware, track_request_queries
+from services.slow_queries import slow_query_log, track_slow_queries
+from services.user_service import password_hasher, user_cache, verified_tokens
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    replica_monitor = None
+    if db.replica_engines:
+        replica_monitor = asyncio.create_task(db.monitor_replicas())
     yield
+    if replica_monitor is not None:
+        replica_monitor.cancel()
+    password_hasher.shutdown()
+    if article_cache is not None:
+        await article_cache.close()
     await db.dispose()
 
 
@@ -25,6 +46,7 @@ app = FastAPI(
 
 app.include_router(auth_router)
 app.include_router(article_router)
+app.include_router(admin_router)
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,12 +56,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    QueryStatsMiddleware, n_plus_one_threshold=settings.db.n_plus_one_threshold
+)
+app.add_middleware(MetricsMiddleware)
+
+for engine in db.engines:
+    instrument_engine(engine)
+    track_request_queries(engine)
+    track_slow_queries(engine, slow_query_log)
+
+register_stats(
+    "db_pool",
+    db.pool_status,
+    counters=("checkouts", "timeouts", "total_wait_seconds"),
+)
+register_stats(
+    "password_hasher",
+    password_hasher.stats,
+    counters=("rejected", "calls", "total_seconds"),
+)
+register_stats("user_cache", user_cache.stats, counters=("hits", "misses"))
+register_stats("verified_tokens", verified_tokens.stats, counters=("hits", "misses"))
+register_stats(
+    "article_cache",
+    article_cache_stats.as_dict,
+    counters=("hits", "misses", "invalidations", "errors"),
+)
+register_stats("slow_queries", slow_query_log.stats, counters=("total", "explained"))
+if search_flight is not None:
+    register_stats(
+        "search_coalescing",
+        search_flight.stats,
+        counters=("calls", "executions", "coalesced", "cached"),
+    )
+
 
 @app.get("/ping", tags=["test"])
 async def ping():
     return {"message": "pong"}
 
 
+@app.get("/health", tags=["test"])
+async def health():
+    return {
+        "status": "ok",
+        "db_pool": db.pool_status(),
+        "db_replicas": db.replica_status(),
+        "article_cache": article_cache_stats.as_dict(),
+        "search_coalescing": search_flight.stats() if search_flight else None,
+    }
+
+
+@app.get("/metrics", tags=["test"], include_in_schema=False)
+async def metrics():
+    return Response(
+        render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 # app.mount("/assets", StaticFiles(directory="dist/assets"), name="assets")
 
 
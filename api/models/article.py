@@ -1,8 +1,18 @@
 import datetime
 from enum import Enum
-
-from sqlalchemy import String, UniqueConstraint, ForeignKey, DateTime, func
+from typing import Optional
+
+from sqlalchemy import (
+    String,
+    UniqueConstraint,
+    ForeignKey,
+    DateTime,
+    func,
+    Computed,
+    Index,
+)
 from sqlalchemy import Enum as SQLAlchemyEnum
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models import Base
@@ -42,6 +52,22 @@ class LangEnum(str, Enum):
 
 lang_enum = SQLAlchemyEnum(LangEnum)
 
+search_config_expression = (
+    "CASE WHEN lang = 'en' THEN 'english'::regconfig ELSE 'russian'::regconfig END"
+)
+
+search_vector_expression = " || ".join(
+    f"setweight(to_tsvector({search_config_expression}, {column}), '{weight}')"
+    for column, weight in (
+        ("name", "A"),
+        ("key_words", "A"),
+        ("terminology", "B"),
+        ("author", "B"),
+        ("usage_context", "C"),
+        ("solving", "C"),
+    )
+)
+
 
 class Article(Base):
     name: Mapped[str] = mapped_column(String(1023), nullable=False)
@@ -69,6 +95,13 @@ class Article(Base):
         nullable=False,
     )
 
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(search_vector_expression, persisted=True),
+        nullable=True,
+        deferred=True,
+    )
+
     problems = relationship("Problem", back_populates="article")
 
     user_id: Mapped[int] = mapped_column(
@@ -79,19 +112,45 @@ class Article(Base):
     __table_args__ = (
         UniqueConstraint("name", name="_name_uc"),
         UniqueConstraint("identifier", name="_identifier_uc"),
+        Index("ix_articles_user_id_id", "user_id", "id"),
+        Index("ix_articles_term_id", "term", "id"),
+        Index("ix_articles_publication_year_id", "publication_year", "id"),
+        Index("ix_articles_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_articles_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_articles_author_trgm",
+            "author",
+            postgresql_using="gin",
+            postgresql_ops={"author": "gin_trgm_ops"},
+        ),
     )
 
     @property
     def term(self):
-        if self.lang == LangEnum.en and self._term:
-            return ru_en_term_mapper.get(self._term, self._term)
-        return self._term
+        return from_ru_term(self._term, self.lang)
 
     @term.setter
     def term(self, value):
-        if isinstance(value, TermEnTypeEnum):
-            self._term = en_ru_term_mapper.get(value)
-        elif isinstance(value, TermRuTypeEnum):
-            self._term = value
-        else:
-            raise ValueError("Invalid term value")
+        self._term = to_ru_term(value)
+
+
+def from_ru_term(
+    value: Optional[TermRuTypeEnum], lang: Optional[LangEnum]
+) -> Optional[TermEnTypeEnum | TermRuTypeEnum]:
+    if lang == LangEnum.en and value:
+        return ru_en_term_mapper.get(value, value)
+    return value
+
+
+def to_ru_term(value: TermEnTypeEnum | TermRuTypeEnum) -> TermRuTypeEnum:
+    if isinstance(value, TermEnTypeEnum):
+        return en_ru_term_mapper.get(value)
+    elif isinstance(value, TermRuTypeEnum):
+        return value
+    else:
+        raise ValueError("Invalid term value")
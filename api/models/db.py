@@ -1,27 +1,358 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Sequence,
+)
+from uuid import uuid4
+
 from typing_extensions import Optional
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    AsyncTransaction,
+    create_async_engine,
+    async_sessionmaker,
+)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from configs.config import settings
+from utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+read_your_writes_key: ContextVar[Optional[str]] = ContextVar(
+    "read_your_writes_key", default=None
+)
+
+read_only_statements = ("SELECT", "SHOW", "EXPLAIN")
+wrote_info_key = "wrote"
+
+replica_lag_query = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) "
+    "END"
+)
+
+
+class PoolWaitStats:
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait_seconds: float, timed_out: bool = False) -> None:
+        self.checkouts += 1
+        self.timeouts += int(timed_out)
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def recreate(self) -> "TimedQueuePool":
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.wait_stats.record(time.perf_counter() - started_at, timed_out)
+
+
+class UnitOfWork:
+    def __init__(self, db: "DatabaseHelper") -> None:
+        self.db = db
+        self.connection: Optional[AsyncConnection] = None
+        self.transaction: Optional[AsyncTransaction] = None
+        self.session: Optional[AsyncSession] = None
+        self.after_transaction_callbacks: List[Callable[[], Awaitable[Any]]] = []
+
+    def __call__(self):
+        return self.__session()
+
+    def read_session_factory(self):
+        # Once the request has touched the primary, later reads stay in its
+        # transaction so they see its own uncommitted writes.
+        if (
+            self.session is None
+            and self.db.replica_engines
+            and not self.db.is_pinned_to_primary()
+        ):
+            return self.db.read_session_factory()
+        return self.__session()
+
+    def after_transaction(self, callback: Callable[[], Awaitable[Any]]) -> None:
+        self.after_transaction_callbacks.append(callback)
+
+    @asynccontextmanager
+    async def __session(self) -> AsyncIterator[AsyncSession]:
+        if self.session is None:
+            self.connection = await self.db.engine.connect()
+            self.transaction = await self.connection.begin()
+            # Repository commits only end the session transaction; the
+            # connection transaction is committed once when the unit of work
+            # completes.
+            self.session = self.db.session_factory(
+                bind=self.connection, join_transaction_mode="rollback_only"
+            )
+
+        yield self.session
+        await self.session.commit()
+
+    async def __aenter__(self) -> "UnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        try:
+            if self.transaction is not None:
+                if (
+                    exc_type is None
+                    and self.transaction.is_active
+                    and self.connection.info.get(wrote_info_key)
+                ):
+                    await self.transaction.commit()
+                else:
+                    await self.transaction.rollback()
+        finally:
+            if self.session is not None:
+                await self.session.close()
+            if self.connection is not None:
+                await self.connection.close()
+            for callback in self.after_transaction_callbacks:
+                await callback()
 
 
 class DatabaseHelper:
-    def __init__(self, url: Optional[str] = None, echo: Optional[bool] = None) -> None:
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        echo: Optional[bool] = None,
+        replica_urls: Optional[Sequence[str]] = None,
+    ) -> None:
         if not url:
             url = str(settings.db.url)
 
         if not echo:
             echo = settings.db.echo
 
-        self.engine = create_async_engine(url=url, echo=echo)
-        self.session_factory = async_sessionmaker(
-            bind=self.engine,
+        if replica_urls is None:
+            replica_urls = [
+                str(replica_url) for replica_url in settings.db.replica_urls
+            ]
+
+        self.engine = self._create_engine(url, echo)
+        self.session_factory = self._create_session_factory(self.engine)
+
+        self.replica_engines = [
+            self._create_engine(replica_url, echo) for replica_url in replica_urls
+        ]
+        self.replica_session_factories = [
+            self._create_session_factory(engine) for engine in self.replica_engines
+        ]
+        self.replica_ejected_until = [0.0] * len(self.replica_engines)
+        self._next_replica = 0
+
+        self.primary_pins = LRUCache(
+            maxsize=settings.db.read_your_writes_size,
+            ttl=settings.db.read_your_writes_seconds,
+        )
+
+        event.listen(
+            self.engine.sync_engine, "before_cursor_execute", self._on_primary_execute
+        )
+        event.listen(self.engine.sync_engine, "commit", self._on_primary_commit)
+        event.listen(self.engine.sync_engine, "rollback", self._on_primary_rollback)
+        for index, engine in enumerate(self.replica_engines):
+            event.listen(
+                engine.sync_engine,
+                "handle_error",
+                lambda context, index=index: self._on_replica_error(index, context),
+            )
+
+    @property
+    def engines(self) -> List[AsyncEngine]:
+        return [self.engine, *self.replica_engines]
+
+    def read_session_factory(self) -> AsyncSession:
+        if not self.replica_engines or self.is_pinned_to_primary():
+            return self.session_factory()
+
+        now = time.monotonic()
+        for _ in range(len(self.replica_engines)):
+            index = self._next_replica
+            self._next_replica = (index + 1) % len(self.replica_engines)
+            if self.replica_ejected_until[index] <= now:
+                return self.replica_session_factories[index]()
+        return self.session_factory()
+
+    def unit_of_work(self) -> UnitOfWork:
+        return UnitOfWork(self)
+
+    @staticmethod
+    def route_reads_for(key: Hashable) -> None:
+        read_your_writes_key.set(str(key))
+
+    def pin_to_primary(self, key: Hashable) -> None:
+        if self.replica_engines:
+            self.primary_pins.set(str(key), True)
+
+    def is_pinned_to_primary(self) -> bool:
+        key = read_your_writes_key.get()
+        return key is not None and self.primary_pins.get(key) is not None
+
+    @staticmethod
+    def _on_primary_execute(conn, cursor, statement, parameters, context, many):
+        if not statement.lstrip().upper().startswith(read_only_statements):
+            conn.info[wrote_info_key] = True
+
+    def _on_primary_commit(self, conn) -> None:
+        # Only transactions that wrote pin the reader; read-only commits would
+        # otherwise keep refreshing the pin and never return to a replica.
+        key = read_your_writes_key.get()
+        if conn.info.pop(wrote_info_key, False) and key is not None:
+            self.pin_to_primary(key)
+
+    @staticmethod
+    def _on_primary_rollback(conn) -> None:
+        conn.info.pop(wrote_info_key, None)
+
+    def _on_replica_error(self, index: int, context) -> None:
+        if context.is_disconnect or isinstance(
+            context.original_exception, (OSError, asyncio.TimeoutError)
+        ):
+            self.eject_replica(index)
+
+    def eject_replica(self, index: int) -> None:
+        if self.replica_ejected_until[index] <= time.monotonic():
+            logger.warning("Ejecting database replica %d", index)
+        self.replica_ejected_until[index] = (
+            time.monotonic() + settings.db.replica_retry_seconds
+        )
+
+    async def check_replicas(self) -> None:
+        for index, engine in enumerate(self.replica_engines):
+            try:
+                lag = await asyncio.wait_for(
+                    self._replica_lag(engine),
+                    settings.db.replica_health_check_timeout,
+                )
+            except Exception as error:
+                logger.warning(
+                    "Database replica %d health check failed: %r", index, error
+                )
+                self.eject_replica(index)
+                continue
+
+            if lag > settings.db.replica_max_lag_seconds:
+                logger.warning("Database replica %d lags by %.1f s", index, lag)
+                self.eject_replica(index)
+            else:
+                self.replica_ejected_until[index] = 0.0
+
+    @staticmethod
+    async def _replica_lag(engine: AsyncEngine) -> float:
+        async with engine.connect() as conn:
+            return await conn.scalar(replica_lag_query)
+
+    async def monitor_replicas(self) -> None:
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(settings.db.replica_health_check_interval)
+
+    def pool_status(self) -> Dict[str, Any]:
+        pool = self.engine.pool
+        wait_stats = pool.wait_stats
+        return {
+            "size": pool.size(),
+            "max_overflow": settings.db.max_overflow,
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "checkouts": wait_stats.checkouts,
+            "timeouts": wait_stats.timeouts,
+            "total_wait_seconds": wait_stats.total_wait_seconds,
+            "max_wait_seconds": wait_stats.max_wait_seconds,
+        }
+
+    def replica_status(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {
+                "healthy": ejected_until <= now,
+                "checked_out": engine.pool.checkedout(),
+                "idle": engine.pool.checkedin(),
+            }
+            for engine, ejected_until in zip(
+                self.replica_engines, self.replica_ejected_until
+            )
+        ]
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
+
+    @classmethod
+    def _create_engine(cls, url: str, echo: bool) -> AsyncEngine:
+        return create_async_engine(
+            url=url,
+            echo=echo,
+            poolclass=TimedQueuePool,
+            pool_size=settings.db.pool_size,
+            max_overflow=settings.db.max_overflow,
+            pool_timeout=settings.db.pool_timeout,
+            pool_recycle=settings.db.pool_recycle,
+            pool_pre_ping=settings.db.pool_pre_ping,
+            connect_args=cls._connect_args(url),
+        )
+
+    @staticmethod
+    def _create_session_factory(engine: AsyncEngine) -> async_sessionmaker:
+        return async_sessionmaker(
+            bind=engine,
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
         )
 
-    async def dispose(self) -> None:
-        await self.engine.dispose()
+    @staticmethod
+    def _connect_args(url: str) -> Dict[str, Any]:
+        if not url.startswith("postgresql+asyncpg"):
+            return {}
+
+        if settings.db.pgbouncer_transaction_mode:
+            return {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+
+        return {
+            "statement_cache_size": settings.db.statement_cache_size,
+            "prepared_statement_cache_size": settings.db.prepared_statement_cache_size,
+        }
 
 
 db = DatabaseHelper()
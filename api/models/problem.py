@@ -1,4 +1,4 @@
-from sqlalchemy import String, ForeignKey
+from sqlalchemy import String, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from models import Base
@@ -15,3 +15,8 @@ class Problem(Base):
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="problems")
+
+    __table_args__ = (
+        Index("ix_problems_article_id_id", "article_id", "id"),
+        Index("ix_problems_user_id", "user_id"),
+    )
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple, AsyncIterator
+
+from sqlalchemy import Row
 
 from models import User, Problem
 from models.article import Article, LangEnum, TermEnTypeEnum, TermRuTypeEnum
@@ -20,6 +22,14 @@ class AbstractUserRepository(ABC):
     async def get_user_by_id(self, user_id: int) -> Optional[User]:
         pass
 
+    @abstractmethod
+    async def get_cached_user_by_id(self, user_id: int) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    def invalidate_user(self, user_id: int) -> None:
+        pass
+
 
 class AbstractArticleRepository(ABC):
     @abstractmethod
@@ -39,19 +49,34 @@ class AbstractArticleRepository(ABC):
         interests: str,
         user_id: int,
         lang: LangEnum,
-    ) -> Optional[Article]:
+    ) -> Row:
+        pass
+
+    @abstractmethod
+    async def import_articles(
+        self, batches: AsyncIterator[List[Dict]], user_id: int
+    ) -> List[Tuple[int, Optional[str]]]:
         pass
 
     @abstractmethod
     async def get_article_by_id(self, article_id: int) -> Optional[Article]:
         pass
 
+    @abstractmethod
+    async def get_article_version(self, article_id: int) -> Optional[Row]:
+        pass
+
     @abstractmethod
     async def get_all_articles(self) -> List[Article]:
         pass
 
     @abstractmethod
-    async def get_all_articles_by_user_id(self, user_id: int) -> List[Article]:
+    async def get_all_articles_by_user_id(
+        self,
+        user_id: int,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Row]:
         pass
 
     @abstractmethod
@@ -77,11 +102,53 @@ class AbstractArticleRepository(ABC):
         name: Optional[str],
         author: Optional[str],
         year: Optional[int],
-    ) -> List[Article]:
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Row]:
+        pass
+
+    @abstractmethod
+    def stream_search(
+        self,
+        term: Optional[TermRuTypeEnum],
+        name: Optional[str],
+        author: Optional[str],
+        year: Optional[int],
+        yield_per: int = 1000,
+    ) -> AsyncIterator[Article]:
+        pass
+
+    @abstractmethod
+    def stream_problems(self, yield_per: int = 1000) -> AsyncIterator[Problem]:
+        pass
+
+    @abstractmethod
+    async def full_text_search(
+        self,
+        query: str,
+        term: Optional[TermRuTypeEnum],
+        name: Optional[str],
+        author: Optional[str],
+        year: Optional[int],
+        after: Optional[Tuple[float, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Row]:
+        pass
+
+    @abstractmethod
+    async def similarity_search(
+        self,
+        term: Optional[TermRuTypeEnum],
+        name: Optional[str],
+        author: Optional[str],
+        year: Optional[int],
+        after: Optional[Tuple[float, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Row]:
         pass
 
     @abstractmethod
     async def update_article_with_problems(
         self, article_id: int, article_data: Dict, problems_data: List[Dict]
-    ) -> Optional[Article]:
+    ) -> bool:
         pass
@@ -0,0 +1,7 @@
+from typing import Optional
+
+
+class UniqueConstraintError(Exception):
+    def __init__(self, constraint_name: Optional[str]) -> None:
+        super().__init__(constraint_name)
+        self.constraint_name = constraint_name
@@ -1,17 +1,107 @@
-from typing import Optional, List, Union, Dict
+from typing import Optional, List, Union, Dict, Tuple, AsyncIterator
 
-from sqlalchemy import select
+from sqlalchemy import (
+    select,
+    Select,
+    func,
+    literal,
+    literal_column,
+    Float,
+    or_,
+    and_,
+    ColumnElement,
+    Row,
+    update,
+    bindparam,
+    Integer,
+    Boolean,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert, ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
 from models import Article, Problem
-from models.article import LangEnum, TermRuTypeEnum, TermEnTypeEnum
+from models.article import LangEnum, TermRuTypeEnum, TermEnTypeEnum, to_ru_term
 from repositories.abc_repositories import AbstractArticleRepository
+from repositories.exceptions import UniqueConstraintError
+
+
+article_short_columns = (
+    Article.id,
+    Article.name,
+    Article.lang,
+    Article.url,
+    Article.user_id,
+)
+
+
+import_columns = (
+    "line_no",
+    "name",
+    "term",
+    "terminology",
+    "author",
+    "key_words",
+    "publication_year",
+    "url",
+    "identifier",
+    "usage_context",
+    "math_apparatus",
+    "solving",
+    "interests",
+    "lang",
+)
+
+create_import_table_stmt = text(
+    f"""
+    CREATE TEMP TABLE articles_import ON COMMIT DROP AS
+    SELECT 0 AS line_no, {", ".join(import_columns[1:])}
+    FROM articles WITH NO DATA
+    """
+)
+
+merge_import_table_stmt = text(
+    f"""
+    WITH inserted AS (
+        INSERT INTO articles ({", ".join(import_columns[1:])}, user_id)
+        SELECT {", ".join(import_columns[1:])}, :user_id
+        FROM articles_import
+        ORDER BY line_no
+        ON CONFLICT DO NOTHING
+        RETURNING name, identifier
+    ),
+    accepted AS (
+        SELECT min(s.line_no) AS line_no
+        FROM articles_import s
+        JOIN inserted i ON i.name = s.name AND i.identifier = s.identifier
+        GROUP BY s.name, s.identifier
+    )
+    SELECT
+        s.line_no,
+        EXISTS (SELECT 1 FROM articles a WHERE a.name = s.name),
+        EXISTS (SELECT 1 FROM articles a WHERE a.identifier = s.identifier)
+    FROM articles_import s
+    WHERE s.line_no NOT IN (SELECT line_no FROM accepted)
+    ORDER BY s.line_no
+    """
+)
 
 
 class ArticleRepository(AbstractArticleRepository):
-    def __init__(self, db_session_factory):
+    def __init__(
+        self,
+        db_session_factory,
+        db_read_session_factory=None,
+        db_detached_session_factory=None,
+    ):
         self.db_session_factory = db_session_factory
+        self.db_read_session_factory = db_read_session_factory or db_session_factory
+        # Streams outlive the request and coalesced searches are shared between
+        # requests, so neither may run in a request-scoped session.
+        self.db_detached_session_factory = (
+            db_detached_session_factory or self.db_read_session_factory
+        )
 
     async def create_article(
         self,
@@ -29,29 +119,103 @@ class ArticleRepository(AbstractArticleRepository):
         interests: str,
         user_id: int,
         lang: LangEnum,
-    ) -> Optional[Article]:
-        article = Article(
-            name=name,
-            terminology=terminology,
-            author=author,
-            key_words=key_words,
-            publication_year=publication_year,
-            url=url,
-            identifier=identifier,
-            usage_context=usage_context,
-            math_apparatus=math_apparatus,
-            solving=solving,
-            interests=interests,
-            user_id=user_id,
-            lang=lang,
+    ) -> Row:
+        stmt = (
+            insert(Article)
+            .values(
+                name=name,
+                _term=to_ru_term(term),
+                terminology=terminology,
+                author=author,
+                key_words=key_words,
+                publication_year=publication_year,
+                url=url,
+                identifier=identifier,
+                usage_context=usage_context,
+                math_apparatus=math_apparatus,
+                solving=solving,
+                interests=interests,
+                user_id=user_id,
+                lang=lang,
+            )
+            .on_conflict_do_nothing()
+            .returning(*article_short_columns)
         )
-        article.term = term
 
         async with self.db_session_factory() as session:
-            session.add(article)
-            await session.commit()
-            await session.refresh(article)
-            return article
+            async with session.begin():
+                article = (await session.execute(stmt)).one_or_none()
+                if article is not None:
+                    return article
+
+                conflicts = (
+                    await session.execute(
+                        select(
+                            func.bool_or(Article.name == name),
+                            func.bool_or(Article.identifier == identifier),
+                        ).where(
+                            or_(Article.name == name, Article.identifier == identifier)
+                        )
+                    )
+                ).one()
+
+        name_conflict, identifier_conflict = conflicts
+        if name_conflict:
+            raise UniqueConstraintError("_name_uc")
+        if identifier_conflict:
+            raise UniqueConstraintError("_identifier_uc")
+        raise UniqueConstraintError(None)
+
+    async def import_articles(
+        self, batches: AsyncIterator[List[Dict]], user_id: int
+    ) -> List[Tuple[int, Optional[str]]]:
+        async with self.db_session_factory() as session:
+            async with session.begin():
+                await session.execute(create_import_table_stmt)
+
+                connection = await session.connection()
+                raw_connection = await connection.get_raw_connection()
+                async for batch in batches:
+                    await raw_connection.driver_connection.copy_records_to_table(
+                        "articles_import",
+                        records=[self.__as_import_record(row) for row in batch],
+                        columns=import_columns,
+                    )
+
+                await session.execute(text("ANALYZE articles_import"))
+                result = await session.execute(
+                    merge_import_table_stmt, {"user_id": user_id}
+                )
+                conflicts = result.all()
+
+        rejected = []
+        for line_no, name_conflict, identifier_conflict in conflicts:
+            if name_conflict:
+                rejected.append((line_no, "_name_uc"))
+            elif identifier_conflict:
+                rejected.append((line_no, "_identifier_uc"))
+            else:
+                rejected.append((line_no, None))
+        return rejected
+
+    @staticmethod
+    def __as_import_record(row: Dict) -> Tuple:
+        return (
+            row["line_no"],
+            row["name"],
+            to_ru_term(row["term"]).name,
+            row["terminology"],
+            row["author"],
+            row["key_words"],
+            row["publication_year"],
+            row["url"],
+            row["identifier"],
+            row["usage_context"],
+            row["math_apparatus"],
+            row["solving"],
+            row["interests"],
+            row["lang"].name,
+        )
 
     async def get_article_by_id(self, article_id: int) -> Optional[Article]:
         stmt = (
@@ -59,11 +223,27 @@ class ArticleRepository(AbstractArticleRepository):
             .where(Article.id == article_id)
             .options(joinedload(Article.problems))
         )
-        async with self.db_session_factory() as session:
+        async with self.db_read_session_factory() as session:
             result = await session.execute(stmt)
             article = result.unique().scalar_one_or_none()
             return article
 
+    async def get_article_version(self, article_id: int) -> Optional[Row]:
+        stmt = (
+            select(
+                Article.updated_at,
+                func.count(Problem.id),
+                func.coalesce(func.max(Problem.id), 0),
+                func.count(Problem.id).filter(Problem.is_solved),
+            )
+            .outerjoin(Problem, Problem.article_id == Article.id)
+            .where(Article.id == article_id)
+            .group_by(Article.id)
+        )
+        async with self.db_read_session_factory() as session:
+            result = await session.execute(stmt)
+            return result.one_or_none()
+
     async def get_article_by_name(
         self,
         article_name: str,
@@ -85,17 +265,25 @@ class ArticleRepository(AbstractArticleRepository):
 
     async def get_all_articles(self) -> List[Article]:
         stmt = select(Article)
-        async with self.db_session_factory() as session:
+        async with self.db_read_session_factory() as session:
             result = await session.execute(stmt)
             articles = result.scalars().all()
             return articles
 
-    async def get_all_articles_by_user_id(self, user_id: int) -> List[Article]:
-        stmt = select(Article).where(Article.user_id == user_id)
-        async with self.db_session_factory() as session:
+    async def get_all_articles_by_user_id(
+        self,
+        user_id: int,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Row]:
+        stmt = self.__paginate(
+            select(*article_short_columns).where(Article.user_id == user_id),
+            after_id,
+            limit,
+        )
+        async with self.db_read_session_factory() as session:
             result = await session.execute(stmt)
-            articles = result.scalars().all()
-            return articles
+            return result.all()
 
     async def create_problem(
         self, problem_text: str, article_id: int, user_id: int
@@ -110,39 +298,68 @@ class ArticleRepository(AbstractArticleRepository):
 
     async def get_all_problems(self) -> List[Problem]:
         stmt = select(Problem)
-        async with self.db_session_factory() as session:
+        async with self.db_read_session_factory() as session:
             result = await session.execute(stmt)
             problems = result.scalars().all()
             return problems
 
+    async def stream_problems(self, yield_per: int = 1000) -> AsyncIterator[Problem]:
+        stmt = (
+            select(Problem).order_by(Problem.id).execution_options(yield_per=yield_per)
+        )
+        async with self.db_detached_session_factory() as session:
+            async for problem in await session.stream_scalars(stmt):
+                yield problem
+
     async def update_article_with_problems(
         self, article_id: int, article_data: Dict, problems_data: List[Dict]
-    ) -> Optional[Article]:
+    ) -> bool:
         async with self.db_session_factory() as session:
             async with session.begin():
-                for problem in problems_data:
-                    await self.__update_problem(session, **problem)
+                if problems_data:
+                    await self.__update_problems(session, article_id, problems_data)
 
-                await self.__update_article(
+                return await self.__update_article(
                     session,
                     **article_data,
                     id=article_id,
                 )
 
-        return await self.get_article_by_id(article_id)
-
     @staticmethod
-    async def __update_problem(
-        session: AsyncSession, id: int, is_solved: bool
-    ) -> Optional[Problem]:
-        result = await session.execute(select(Problem).where(Problem.id == id))
-        problem = result.scalar_one_or_none()
+    def __paginate(
+        stmt: Select, after_id: Optional[int], limit: Optional[int]
+    ) -> Select:
+        stmt = stmt.order_by(Article.id)
+
+        if after_id is not None:
+            stmt = stmt.where(Article.id > after_id)
 
-        if problem is None:
-            return
+        if limit is not None:
+            stmt = stmt.limit(limit)
 
-        problem.is_solved = is_solved
-        await session.flush()
+        return stmt
+
+    @staticmethod
+    async def __update_problems(
+        session: AsyncSession, article_id: int, problems_data: List[Dict]
+    ) -> None:
+        values = func.unnest(
+            bindparam(
+                "ids", [problem["id"] for problem in problems_data], ARRAY(Integer)
+            ),
+            bindparam(
+                "is_solved",
+                [problem["is_solved"] for problem in problems_data],
+                ARRAY(Boolean),
+            ),
+        ).table_valued("id", "is_solved")
+
+        await session.execute(
+            update(Problem)
+            .where(Problem.id == values.c.id, Problem.article_id == article_id)
+            .values(is_solved=values.c.is_solved)
+            .execution_options(synchronize_session=False)
+        )
 
     @staticmethod
     async def __update_article(
@@ -159,27 +376,27 @@ class ArticleRepository(AbstractArticleRepository):
         math_apparatus: str,
         solving: str,
         interests: str,
-    ) -> Optional[Article]:
-        article = (
-            await session.execute(select(Article).where(Article.id == id))
-        ).scalar_one_or_none()
-
-        if article is None:
-            return None
-
-        article.name = name
-        article.term = term
-        article.terminology = terminology
-        article.author = author
-        article.key_words = key_words
-        article.url = url
-        article.identifier = identifier
-        article.usage_context = usage_context
-        article.math_apparatus = math_apparatus
-        article.solving = solving
-        article.interests = interests
-
-        await session.flush()
+    ) -> bool:
+        result = await session.execute(
+            update(Article)
+            .where(Article.id == id)
+            .values(
+                name=name,
+                _term=to_ru_term(term),
+                terminology=terminology,
+                author=author,
+                key_words=key_words,
+                url=url,
+                identifier=identifier,
+                usage_context=usage_context,
+                math_apparatus=math_apparatus,
+                solving=solving,
+                interests=interests,
+            )
+            .returning(Article.id)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one_or_none() is not None
 
     async def search(
         self,
@@ -187,22 +404,137 @@ class ArticleRepository(AbstractArticleRepository):
         name: Optional[str],
         author: Optional[str],
         year: Optional[int],
-    ) -> List[Article]:
-        stmt = select(Article)
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Row]:
+        stmt = self.__filter(select(*article_short_columns), term, name, author, year)
+        stmt = self.__paginate(stmt, after_id, limit)
+
+        async with self.db_detached_session_factory() as session:
+            result = await session.execute(stmt)
+            return result.all()
+
+    async def stream_search(
+        self,
+        term: Optional[TermRuTypeEnum],
+        name: Optional[str],
+        author: Optional[str],
+        year: Optional[int],
+        yield_per: int = 1000,
+    ) -> AsyncIterator[Article]:
+        stmt = self.__filter(select(Article), term, name, author, year)
+        stmt = stmt.order_by(Article.id).execution_options(yield_per=yield_per)
+
+        async with self.db_detached_session_factory() as session:
+            async for article in await session.stream_scalars(stmt):
+                yield article
+
+    async def full_text_search(
+        self,
+        query: str,
+        term: Optional[TermRuTypeEnum],
+        name: Optional[str],
+        author: Optional[str],
+        year: Optional[int],
+        after: Optional[Tuple[float, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Row]:
+        ts_query = func.websearch_to_tsquery(
+            literal_column("'russian'::regconfig"), query
+        ).op("||")(
+            func.websearch_to_tsquery(literal_column("'english'::regconfig"), query)
+        )
+        rank = func.ts_rank(Article.search_vector, ts_query, type_=Float)
+
+        stmt = select(*article_short_columns, rank.label("rank")).where(
+            Article.search_vector.op("@@", is_comparison=True)(ts_query)
+        )
+        stmt = self.__filter(stmt, term, name, author, year)
+        stmt = self.__paginate_ranked(stmt, rank, after, limit)
+
+        async with self.db_detached_session_factory() as session:
+            result = await session.execute(stmt)
+            return result.all()
+
+    async def similarity_search(
+        self,
+        term: Optional[TermRuTypeEnum],
+        name: Optional[str],
+        author: Optional[str],
+        year: Optional[int],
+        after: Optional[Tuple[float, int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Row]:
+        similarities = []
+        stmt = self.__filter(select(*article_short_columns), term, None, None, year)
+
+        if name is not None:
+            stmt = stmt.where(Article.name.op("%", is_comparison=True)(name))
+            similarities.append(func.similarity(Article.name, name, type_=Float))
+
+        if author is not None:
+            stmt = stmt.where(Article.author.op("%", is_comparison=True)(author))
+            similarities.append(func.similarity(Article.author, author, type_=Float))
+
+        rank = (
+            func.greatest(*similarities, type_=Float)
+            if similarities
+            else literal(0.0, Float)
+        )
+        stmt = stmt.add_columns(rank.label("rank"))
+        stmt = self.__paginate_ranked(stmt, rank, after, limit)
+
+        async with self.db_detached_session_factory() as session:
+            result = await session.execute(stmt)
+            return result.all()
+
+    @staticmethod
+    def __paginate_ranked(
+        stmt: Select,
+        rank: ColumnElement[float],
+        after: Optional[Tuple[float, int]],
+        limit: Optional[int],
+    ) -> Select:
+        stmt = stmt.order_by(rank.desc(), Article.id)
+
+        if after is not None:
+            after_rank, after_id = after
+            stmt = stmt.where(
+                or_(
+                    rank < after_rank,
+                    and_(rank == after_rank, Article.id > after_id),
+                )
+            )
 
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        return stmt
+
+    @staticmethod
+    def __filter(
+        stmt: Select,
+        term: Optional[TermRuTypeEnum],
+        name: Optional[str],
+        author: Optional[str],
+        year: Optional[int],
+    ) -> Select:
         if term is not None:
             stmt = stmt.where(Article._term == term)
 
         if name is not None:
-            stmt = stmt.where(Article.name.like(f"%{name}%"))
+            stmt = stmt.where(Article.name.ilike(f"%{escape_like(name)}%", escape="/"))
 
         if author is not None:
-            stmt = stmt.where(Article.author.like(f"%{author}%"))
+            stmt = stmt.where(
+                Article.author.ilike(f"%{escape_like(author)}%", escape="/")
+            )
 
         if year is not None:
             stmt = stmt.where(Article.publication_year == year)
 
-        async with self.db_session_factory() as session:
-            result = await session.execute(stmt)
-            articles = result.scalars().all()
-            return articles
+        return stmt
+
+
+def escape_like(value: str) -> str:
+    return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
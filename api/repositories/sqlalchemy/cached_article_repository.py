@@ -0,0 +1,134 @@
+import datetime
+import logging
+from typing import Optional, List, Dict
+
+import orjson
+from sqlalchemy import DateTime, Enum as SQLAlchemyEnum, inspect
+
+from models import Article, Problem
+from repositories.sqlalchemy.article_repository import ArticleRepository
+from utils.cache import CacheStats
+from utils.cache_backends import CacheBackend
+
+logger = logging.getLogger(__name__)
+
+
+class CachedArticleRepository(ArticleRepository):
+    def __init__(
+        self,
+        db_session_factory,
+        cache: CacheBackend,
+        stats: CacheStats,
+        ttl: Optional[int] = None,
+        db_read_session_factory=None,
+        db_detached_session_factory=None,
+    ):
+        super().__init__(
+            db_session_factory, db_read_session_factory, db_detached_session_factory
+        )
+        self.cache = cache
+        self.stats = stats
+        self.ttl = ttl
+
+    async def get_article_by_id(self, article_id: int) -> Optional[Article]:
+        key = self.__key(article_id)
+        try:
+            cached = await self.cache.get(key)
+        except Exception:
+            logger.exception("Article cache read failed")
+            self.stats.errors += 1
+            cached = None
+
+        if cached is not None:
+            self.stats.hits += 1
+            return self.__load(orjson.loads(cached))
+
+        self.stats.misses += 1
+        # Fill from the primary so a lagging replica cannot re-cache stale data
+        # right after an invalidation.
+        article = await ArticleRepository(self.db_session_factory).get_article_by_id(
+            article_id
+        )
+        if article is not None:
+            try:
+                await self.cache.set(key, orjson.dumps(self.__dump(article)), self.ttl)
+            except Exception:
+                logger.exception("Article cache write failed")
+                self.stats.errors += 1
+        return article
+
+    async def create_problem(
+        self, problem_text: str, article_id: int, user_id: int
+    ) -> Optional[Problem]:
+        await self.invalidate(article_id)
+        problem = await super().create_problem(problem_text, article_id, user_id)
+        await self.__invalidate_after_transaction(article_id)
+        return problem
+
+    async def update_article_with_problems(
+        self, article_id: int, article_data: Dict, problems_data: List[Dict]
+    ) -> bool:
+        await self.invalidate(article_id)
+        updated = await super().update_article_with_problems(
+            article_id, article_data, problems_data
+        )
+        await self.__invalidate_after_transaction(article_id)
+        return updated
+
+    async def invalidate(self, article_id: int) -> None:
+        self.stats.invalidations += 1
+        try:
+            await self.cache.delete(self.__key(article_id))
+        except Exception:
+            logger.exception("Article cache invalidation failed")
+            self.stats.errors += 1
+
+    async def __invalidate_after_transaction(self, article_id: int) -> None:
+        # Inside a unit of work the write is not visible until it commits, so a
+        # concurrent miss could otherwise re-cache the old row.
+        after_transaction = getattr(self.db_session_factory, "after_transaction", None)
+        if after_transaction is None:
+            await self.invalidate(article_id)
+        else:
+            after_transaction(lambda: self.invalidate(article_id))
+
+    @staticmethod
+    def __key(article_id: int) -> str:
+        return f"article:{article_id}"
+
+    @staticmethod
+    def __dump(article: Article) -> Dict:
+        data = dump_columns(article)
+        data["problems"] = [dump_columns(problem) for problem in article.problems]
+        return data
+
+    @staticmethod
+    def __load(data: Dict) -> Article:
+        problems = data.pop("problems")
+        article = load_columns(Article, data)
+        article.problems = [load_columns(Problem, problem) for problem in problems]
+        return article
+
+
+def dump_columns(obj) -> Dict:
+    return {
+        attr.key: getattr(obj, attr.key)
+        for attr in inspect(type(obj)).column_attrs
+        if not attr.deferred
+    }
+
+
+def load_columns(model, data: Dict):
+    values = {}
+    for attr in inspect(model).column_attrs:
+        if attr.key not in data:
+            continue
+
+        value = data[attr.key]
+        column_type = attr.columns[0].type
+        if value is not None and isinstance(column_type, SQLAlchemyEnum):
+            value = column_type.enum_class(value)
+        elif value is not None and isinstance(column_type, DateTime):
+            value = datetime.datetime.fromisoformat(value)
+        values[attr.key] = value
+    return model(**values)
@@ -4,11 +4,23 @@ from sqlalchemy import select
 
 from models import User
 from repositories.abc_repositories import AbstractUserRepository
+from utils.cache import LRUCache
 
 
 class UserRepository(AbstractUserRepository):
-    def __init__(self, db_session_factory):
+    def __init__(
+        self,
+        db_session_factory,
+        user_cache: Optional[LRUCache] = None,
+        db_read_session_factory=None,
+        db_detached_session_factory=None,
+    ):
         self.db_session_factory = db_session_factory
+        self.db_read_session_factory = db_read_session_factory or db_session_factory
+        self.db_detached_session_factory = (
+            db_detached_session_factory or db_session_factory
+        )
+        self.user_cache = user_cache
 
     async def create_user(
         self, email: str, name: str, hashed_password: bytes
@@ -19,16 +31,32 @@ class UserRepository(AbstractUserRepository):
                 session.add(db_user)
                 await session.commit()
             await session.refresh(db_user)
+            self.invalidate_user(db_user.id)
             return db_user
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
         stmt = select(User).where(User.email == email)
-        async with self.db_session_factory() as session:
+        async with self.db_detached_session_factory() as session:
             result = await session.execute(stmt)
             return result.scalar_one_or_none()
 
     async def get_user_by_id(self, user_id: int) -> Optional[User]:
         stmt = select(User).where(User.id == user_id)
-        async with self.db_session_factory() as session:
+        async with self.db_read_session_factory() as session:
             result = await session.execute(stmt)
             return result.scalar_one_or_none()
+
+    async def get_cached_user_by_id(self, user_id: int) -> Optional[User]:
+        if self.user_cache is None:
+            return await self.get_user_by_id(user_id)
+
+        user = self.user_cache.get(str(user_id))
+        if user is None:
+            user = await self.get_user_by_id(user_id)
+            if user is not None:
+                self.user_cache.set(str(user_id), user)
+        return user
+
+    def invalidate_user(self, user_id: int) -> None:
+        if self.user_cache is not None:
+            self.user_cache.delete(str(user_id))
@@ -0,0 +1,22 @@
+from typing import Any, Dict, List
+
+from fastapi import APIRouter
+from starlette import status
+
+from services.slow_queries import slow_query_log
+from services.user_service import admin_user
+
+router = APIRouter(
+    prefix="/api/admin",
+    tags=["admin"],
+)
+
+
+@router.get("/slow-queries")
+async def slow_queries(user: admin_user) -> List[Dict[str, Any]]:
+    return slow_query_log.recent()
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_slow_queries(user: admin_user) -> None:
+    slow_query_log.clear()
@@ -1,18 +1,24 @@
-from typing import Annotated, List, Optional, Union
+from typing import Annotated, AsyncIterator, List, Optional, Union
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request
 from starlette import status
+from starlette.responses import Response, StreamingResponse
 
 from models.article import TermRuTypeEnum, TermEnTypeEnum, LangEnum
 from schemas.articles_schemas import (
-    ArticleShortSchema,
     ArticleSchema,
     ArticleWithProblemsSchema,
     ProblemSchema,
     ArticleWithProblemsRequestSchema, ArticleResponseSchema, NewProblemRequestSchema,
+    ArticleShortPageSchema,
+    ImportReportSchema,
+    ExportFormatEnum,
 )
+from configs.config import settings
 from services.article_service import ArticleService, article_service
+from services.etag import make_body_etag, not_modified
 from services.user_service import current_user
+from utils.responses import PydanticResponse
 
 router = APIRouter(
     prefix="/api/articles",
@@ -28,12 +34,18 @@ router = APIRouter(
 #     return await articles_service.get_articles()
 
 
-@router.get("/my/")
+@router.get("/my/", response_model=ArticleShortPageSchema)
 async def my_articles(
     user: current_user,
     articles_service: Annotated[ArticleService, Depends(article_service)],
-) -> List[ArticleShortSchema]:
-    return await articles_service.get_articles_by_user_id(user.id)
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Annotated[
+        int, Query(ge=1, le=settings.pagination.max_limit)
+    ] = settings.pagination.default_limit,
+):
+    page = await articles_service.get_articles_by_user_id(user.id, cursor, limit)
+    return page_response(request, page, user.id)
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
@@ -46,16 +58,97 @@ async def create_article(
     return ArticleResponseSchema(id=new_short_article.id)
 
 
-@router.get("/")
+@router.post("/bulk")
+async def import_articles(
+    user: current_user,
+    articles_service: Annotated[ArticleService, Depends(article_service)],
+    request: Request,
+) -> ImportReportSchema:
+    return await articles_service.import_articles(
+        user.id,
+        request.stream(),
+        request.headers.get("content-type", "application/x-ndjson"),
+    )
+
+
+@router.get("/export")
+async def export_articles(
+    user: current_user,
+    articles_service: Annotated[ArticleService, Depends(article_service)],
+    format: ExportFormatEnum = ExportFormatEnum.ndjson,
+    term: Optional[Union[TermRuTypeEnum, TermEnTypeEnum]] = None,
+    name: Optional[str] = None,
+    author: Optional[str] = None,
+    year: Optional[int] = None,
+) -> StreamingResponse:
+    return export_response(
+        articles_service.export_articles(format, term, name, author, year),
+        format,
+        "articles",
+    )
+
+
+@router.get("/problems/export")
+async def export_problems(
+    user: current_user,
+    articles_service: Annotated[ArticleService, Depends(article_service)],
+    format: ExportFormatEnum = ExportFormatEnum.ndjson,
+) -> StreamingResponse:
+    return export_response(articles_service.export_problems(format), format, "problems")
+
+
+def export_response(
+    content: AsyncIterator[bytes], export_format: ExportFormatEnum, filename: str
+) -> StreamingResponse:
+    if export_format == ExportFormatEnum.csv:
+        media_type = "text/csv"
+    else:
+        media_type = "application/x-ndjson"
+
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{filename}.{export_format.value}"'
+            )
+        },
+    )
+
+
+@router.get("/", response_model=ArticleShortPageSchema)
 async def get_articles_with_search(
     user: current_user,
     articles_service: Annotated[ArticleService, Depends(article_service)],
+    request: Request,
     term: Optional[Union[TermRuTypeEnum, TermEnTypeEnum]] = None,
     name: Optional[str] = None,
     author: Optional[str] = None,
     year: Optional[int] = None,
-) -> List[ArticleShortSchema]:
-    return await articles_service.get_articles(term, name, author, year)
+    q: Optional[str] = None,
+    fuzzy: bool = False,
+    cursor: Optional[str] = None,
+    limit: Annotated[
+        int, Query(ge=1, le=settings.pagination.max_limit)
+    ] = settings.pagination.default_limit,
+):
+    page = await articles_service.get_articles(
+        term, name, author, year, cursor, limit, q, fuzzy
+    )
+    return page_response(request, page)
+
+
+def page_response(request: Request, page: ArticleShortPageSchema, *scope) -> Response:
+    # List pages have no cheap monotonic version, so the tag is taken from the
+    # rendered page itself.
+    response = PydanticResponse(page)
+    etag = make_body_etag(response.body, request.url.query, *scope)
+    not_modified_response = not_modified(request, etag)
+    if not_modified_response is not None:
+        return not_modified_response
+
+    response.headers["ETag"] = etag
+    return response
 
 
 @router.get("/{article_id}/", response_model=ArticleWithProblemsSchema)
@@ -63,18 +156,28 @@ async def article_by_id(
     user: current_user,
     articles_service: Annotated[ArticleService, Depends(article_service)],
     article_id: int,
+    request: Request,
 ):
-    return await articles_service.get_article_by_id(article_id)
+    if request.headers.get("if-none-match"):
+        etag = await articles_service.get_article_etag(article_id)
+        not_modified_response = not_modified(request, etag)
+        if not_modified_response is not None:
+            return not_modified_response
 
+    article, etag = await articles_service.get_article_with_etag(article_id)
+    return PydanticResponse(article, headers={"ETag": etag})
 
-@router.post("/{article_id}/")
+
+@router.post("/{article_id}/", response_model=ProblemSchema)
 async def create_problem(
     user: current_user,
     articles_service: Annotated[ArticleService, Depends(article_service)],
     article_id: int,
     body: NewProblemRequestSchema,
-) -> ProblemSchema:
-    return await articles_service.create_problem(user.id, article_id, body.problem)
+):
+    return PydanticResponse(
+        await articles_service.create_problem(user.id, article_id, body.problem)
+    )
 
 
 @router.put("/{article_id}/", response_model=ArticleWithProblemsSchema)
@@ -84,8 +187,10 @@ async def update_article(
     article_id: int,
     article: ArticleWithProblemsRequestSchema,
 ):
-    return await articles_service.update_article_with_problems(
-        user.id, article_id, article
+    return PydanticResponse(
+        await articles_service.update_article_with_problems(
+            user.id, article_id, article
+        )
     )
 
 
@@ -1,4 +1,5 @@
-from typing import List, Union
+from enum import Enum
+from typing import List, Union, Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -15,6 +16,11 @@ class ArticleShortSchema(BaseModel):
     user_id: int
 
 
+class ArticleShortPageSchema(BaseModel):
+    items: List[ArticleShortSchema]
+    next_cursor: Optional[str] = None
+
+
 class ArticleSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -41,6 +47,16 @@ class ProblemSchema(BaseModel):
     is_solved: bool
 
 
+class ProblemExportSchema(ProblemSchema):
+    article_id: int
+    user_id: int
+
+
+class ArticleExportSchema(ArticleSchema):
+    id: int
+    user_id: int
+
+
 class ArticleWithProblemsSchema(ArticleSchema):
     id: int
     user_id: int
@@ -74,3 +90,20 @@ class ArticleResponseSchema(BaseModel):
 
 class NewProblemRequestSchema(BaseModel):
     problem: str
+
+
+class ImportErrorSchema(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportReportSchema(BaseModel):
+    received: int
+    inserted: int
+    failed: int
+    errors: List[ImportErrorSchema]
+
+
+class ExportFormatEnum(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
@@ -0,0 +1,102 @@
+import csv
+from typing import AsyncIterator, Dict, Optional, Tuple, Union
+
+from pydantic import ValidationError
+from sqlalchemy import String
+
+from models import Article
+from schemas.articles_schemas import ArticleSchema
+
+string_column_lengths = {
+    column.name: column.type.length
+    for column in Article.__table__.columns
+    if isinstance(column.type, String) and column.type.length
+}
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.decode("utf-8", errors="replace").rstrip("\r")
+
+    if buffer:
+        yield line_no + 1, buffer.decode("utf-8", errors="replace").rstrip("\r")
+
+
+async def iter_ndjson_records(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[Tuple[int, Optional[ArticleSchema], Optional[str]]]:
+    async for line_no, line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        yield line_no, *validate_article(line)
+
+
+async def iter_csv_records(
+    chunks: AsyncIterator[bytes],
+) -> AsyncIterator[Tuple[int, Optional[ArticleSchema], Optional[str]]]:
+    header = None
+    record_line_no = 0
+    record = ""
+
+    async for line_no, line in iter_lines(chunks):
+        if not record:
+            if not line.strip():
+                continue
+            record_line_no = line_no
+            record = line
+        else:
+            record += "\n" + line
+
+        # A quoted field may span several lines; wait for the closing quote.
+        if record.count('"') % 2:
+            continue
+
+        values = next(csv.reader([record]))
+        record = ""
+
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+
+        if len(values) != len(header):
+            yield record_line_no, None, (
+                f"Expected {len(header)} columns, got {len(values)}"
+            )
+            continue
+
+        yield record_line_no, *validate_article(dict(zip(header, values)))
+
+    if record:
+        yield record_line_no, None, "Unterminated quoted field"
+
+
+def validate_article(
+    raw: Union[str, Dict],
+) -> Tuple[Optional[ArticleSchema], Optional[str]]:
+    try:
+        if isinstance(raw, str):
+            article = ArticleSchema.model_validate_json(raw)
+        else:
+            article = ArticleSchema.model_validate(raw)
+    except ValidationError as e:
+        return None, format_validation_error(e)
+
+    for field, max_length in string_column_lengths.items():
+        value = getattr(article, field, None)
+        if isinstance(value, str) and len(value) > max_length:
+            return None, f"{field}: must be at most {max_length} characters"
+
+    return article, None
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc']) or 'body'}: {e['msg']}"
+        for e in error.errors()
+    )
@@ -1,19 +1,44 @@
-from typing import List, Union, Optional
+from typing import List, Union, Optional, AsyncIterator, Dict, Type, Tuple
 
 from fastapi import HTTPException
+from pydantic import BaseModel
 from starlette import status
 
+from configs.config import settings
 from models import db
-from models.article import TermRuTypeEnum, TermEnTypeEnum, en_ru_term_mapper, LangEnum
+from models.article import (
+    TermRuTypeEnum,
+    TermEnTypeEnum,
+    en_ru_term_mapper,
+    LangEnum,
+    to_ru_term,
+    from_ru_term,
+)
 from repositories.abc_repositories import AbstractArticleRepository
+from repositories.exceptions import UniqueConstraintError
 from repositories.sqlalchemy.article_repository import ArticleRepository
+from repositories.sqlalchemy.cached_article_repository import CachedArticleRepository
 from schemas.articles_schemas import (
     ArticleSchema,
     ArticleShortSchema,
     ArticleWithProblemsSchema,
     ProblemSchema,
     ArticleWithProblemsRequestSchema,
+    ArticleShortPageSchema,
+    ImportErrorSchema,
+    ImportReportSchema,
+    ArticleExportSchema,
+    ProblemExportSchema,
+    ExportFormatEnum,
 )
+from services.article_import import iter_csv_records, iter_ndjson_records
+from services.etag import make_etag
+from services.export import iter_csv, iter_ndjson
+from services.pagination import clamp_limit, encode_cursor, decode_cursor
+from services.unit_of_work import unit_of_work
+from utils.cache import CacheStats
+from utils.cache_backends import create_cache_backend
+from utils.single_flight import SingleFlight
 
 
 class ArticleService:
@@ -23,40 +48,133 @@ class ArticleService:
     async def create_article(
         self, user_id: int, article: ArticleSchema
     ) -> ArticleShortSchema:
-        if await self.article_repo.get_article_by_name(article.name) is not None:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f'Article with name "{article.name}" already exists',
+        try:
+            new_article = await self.article_repo.create_article(
+                **article.model_dump(), user_id=user_id
             )
-
-        if (
-            await self.article_repo.get_article_by_identifier(article.identifier)
-            is not None
-        ):
+        except UniqueConstraintError as e:
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
-                detail=f'Article with identifier "{
-                    article.identifier}" already exists',
+                detail=self.conflict_detail(
+                    e.constraint_name, article.name, article.identifier
+                ),
             )
 
-        new_article = await self.article_repo.create_article(
-            **article.model_dump(), user_id=user_id
-        )
         return ArticleShortSchema.model_validate(new_article)
 
+    async def import_articles(
+        self, user_id: int, chunks: AsyncIterator[bytes], content_type: str
+    ) -> ImportReportSchema:
+        if content_type.startswith("text/csv"):
+            records = iter_csv_records(chunks)
+        else:
+            records = iter_ndjson_records(chunks)
+
+        received = 0
+        errors = []
+        articles = {}
+
+        async def batches() -> AsyncIterator[List[Dict]]:
+            nonlocal received
+            batch = []
+            async for line_no, article, error in records:
+                received += 1
+                if error is not None:
+                    errors.append(ImportErrorSchema(line=line_no, detail=error))
+                    continue
+
+                articles[line_no] = (article.name, article.identifier)
+                batch.append({"line_no": line_no, **article.model_dump()})
+                if len(batch) >= settings.article_import.batch_size:
+                    yield batch
+                    batch = []
+
+            if batch:
+                yield batch
+
+        rejected = await self.article_repo.import_articles(batches(), user_id)
+
+        for line_no, constraint_name in rejected:
+            if constraint_name is None:
+                detail = "Duplicate of an earlier row in this upload"
+            else:
+                detail = self.conflict_detail(constraint_name, *articles[line_no])
+            errors.append(ImportErrorSchema(line=line_no, detail=detail))
+
+        errors.sort(key=lambda error: error.line)
+        return ImportReportSchema(
+            received=received,
+            inserted=received - len(errors),
+            failed=len(errors),
+            errors=errors,
+        )
+
+    def export_articles(
+        self,
+        export_format: ExportFormatEnum,
+        term: Optional[Union[TermRuTypeEnum, TermEnTypeEnum]] = None,
+        name: Optional[str] = None,
+        author: Optional[str] = None,
+        year: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        new_term = (
+            term if isinstance(term, TermRuTypeEnum) else en_ru_term_mapper.get(term)
+        )
+        articles = self.article_repo.stream_search(
+            new_term, name, author, year, settings.article_export.yield_per
+        )
+        return self.__serialize(export_format, articles, ArticleExportSchema)
+
+    def export_problems(self, export_format: ExportFormatEnum) -> AsyncIterator[bytes]:
+        problems = self.article_repo.stream_problems(settings.article_export.yield_per)
+        return self.__serialize(export_format, problems, ProblemExportSchema)
+
+    @staticmethod
+    def __serialize(
+        export_format: ExportFormatEnum, items: AsyncIterator, schema: Type[BaseModel]
+    ) -> AsyncIterator[bytes]:
+        if export_format == ExportFormatEnum.csv:
+            return iter_csv(items, schema)
+        return iter_ndjson(items, schema)
+
     async def get_article_by_id(self, article_id: int) -> ArticleWithProblemsSchema:
+        article, _ = await self.get_article_with_etag(article_id)
+        return article
+
+    async def get_article_with_etag(
+        self, article_id: int
+    ) -> Tuple[ArticleWithProblemsSchema, str]:
         article = await self.article_repo.get_article_by_id(article_id)
         if article is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Article not found"
             )
-        return ArticleWithProblemsSchema.model_validate(article)
+        etag = make_etag(
+            article.updated_at,
+            len(article.problems),
+            max((problem.id for problem in article.problems), default=0),
+            sum(problem.is_solved for problem in article.problems),
+        )
+        return ArticleWithProblemsSchema.model_validate(article), etag
 
-    async def get_articles_by_user_id(self, user_id: int) -> List[ArticleShortSchema]:
-        return [
-            ArticleShortSchema.model_validate(article)
-            for article in await self.article_repo.get_all_articles_by_user_id(user_id)
-        ]
+    async def get_article_etag(self, article_id: int) -> Optional[str]:
+        version = await self.article_repo.get_article_version(article_id)
+        if version is None:
+            return None
+        return make_etag(*version)
+
+    async def get_articles_by_user_id(
+        self,
+        user_id: int,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> ArticleShortPageSchema:
+        limit = clamp_limit(limit)
+        after_id = self.__decode_id_cursor(cursor)
+        results = await self.article_repo.get_all_articles_by_user_id(
+            user_id, after_id, limit + 1
+        )
+        return self.__make_page(results, limit)
 
     async def create_problem(
         self, user_id: int, article_id: int, problem_text: str
@@ -83,12 +201,97 @@ class ArticleService:
         name: Optional[str] = None,
         author: Optional[str] = None,
         year: Optional[int] = None,
-    ) -> List[ArticleShortSchema]:
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        query: Optional[str] = None,
+        fuzzy: bool = False,
+    ) -> ArticleShortPageSchema:
         new_term = (
             term if isinstance(term, TermRuTypeEnum) else en_ru_term_mapper.get(term)
         )
-        results = await self.article_repo.search(new_term, name, author, year)
-        return [ArticleShortSchema.model_validate(article) for article in results]
+        limit = clamp_limit(limit)
+
+        async def search() -> ArticleShortPageSchema:
+            return await self.__search(
+                new_term, name, author, year, cursor, limit, query, fuzzy
+            )
+
+        if search_flight is None:
+            return await search()
+
+        key = (
+            new_term,
+            self.__normalize(name),
+            self.__normalize(author),
+            year,
+            self.__normalize(query),
+            fuzzy,
+            cursor,
+            limit,
+            db.is_pinned_to_primary(),
+        )
+        return await search_flight.run(key, search)
+
+    @staticmethod
+    def __normalize(value: Optional[str]) -> Optional[str]:
+        return value.lower() if value else None
+
+    async def __search(
+        self,
+        term: Optional[TermRuTypeEnum],
+        name: Optional[str],
+        author: Optional[str],
+        year: Optional[int],
+        cursor: Optional[str],
+        limit: int,
+        query: Optional[str],
+        fuzzy: bool,
+    ) -> ArticleShortPageSchema:
+        if query:
+            after = decode_cursor(cursor, float, int)
+            results = await self.article_repo.full_text_search(
+                query, term, name, author, year, after, limit + 1
+            )
+            return self.__make_ranked_page(results, limit)
+
+        if fuzzy and (name or author):
+            after = decode_cursor(cursor, float, int)
+            results = await self.article_repo.similarity_search(
+                term, name, author, year, after, limit + 1
+            )
+            return self.__make_ranked_page(results, limit)
+
+        after_id = self.__decode_id_cursor(cursor)
+        results = await self.article_repo.search(
+            term, name, author, year, after_id, limit + 1
+        )
+        return self.__make_page(results, limit)
+
+    @staticmethod
+    def __decode_id_cursor(cursor: Optional[str]) -> Optional[int]:
+        decoded = decode_cursor(cursor, int)
+        return decoded[0] if decoded else None
+
+    @staticmethod
+    def __make_page(results: List, limit: int) -> ArticleShortPageSchema:
+        items = [
+            ArticleShortSchema.model_construct(**row._mapping)
+            for row in results[:limit]
+        ]
+        next_cursor = encode_cursor(items[-1].id) if len(results) > limit else None
+        return ArticleShortPageSchema(items=items, next_cursor=next_cursor)
+
+    @staticmethod
+    def __make_ranked_page(results: List, limit: int) -> ArticleShortPageSchema:
+        items = [
+            ArticleShortSchema.model_construct(**row._mapping)
+            for row in results[:limit]
+        ]
+        next_cursor = None
+        if len(results) > limit:
+            last_row = results[limit - 1]
+            next_cursor = encode_cursor(last_row.rank, last_row.id)
+        return ArticleShortPageSchema(items=items, next_cursor=next_cursor)
 
     async def update_article_with_problems(
         self,
@@ -129,11 +332,46 @@ class ArticleService:
         article_data = article_with_problems.model_dump()
         problems_data = article_data.get("problems", [])
         del article_data["problems"]
-        updated_article = await self.article_repo.update_article_with_problems(
+        updated = await self.article_repo.update_article_with_problems(
             article_id, article_data, problems_data
         )
+        if not updated:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Article not found"
+            )
 
-        return ArticleWithProblemsSchema.model_validate(updated_article)
+        solved_problems = {
+            problem["id"]: problem["is_solved"] for problem in problems_data
+        }
+        response = ArticleWithProblemsSchema.model_validate(article)
+        return response.model_copy(
+            update={
+                **article_data,
+                "term": from_ru_term(
+                    to_ru_term(article_with_problems.term), article.lang
+                ),
+                "problems": [
+                    problem.model_copy(
+                        update={
+                            "is_solved": solved_problems.get(
+                                problem.id, problem.is_solved
+                            )
+                        }
+                    )
+                    for problem in response.problems
+                ],
+            }
+        )
+
+    @staticmethod
+    def conflict_detail(
+        constraint_name: Optional[str], name: str, identifier: str
+    ) -> str:
+        if constraint_name == "_name_uc":
+            return f'Article with name "{name}" already exists'
+        if constraint_name == "_identifier_uc":
+            return f'Article with identifier "{identifier}" already exists'
+        return "Article already exists"
 
     @staticmethod
     async def get_terms_by_lang(lang: LangEnum) -> List[str]:
@@ -142,5 +380,37 @@ class ArticleService:
         return list(TermEnTypeEnum)
 
 
-def article_service():
-    return ArticleService(ArticleRepository(db.session_factory))
+article_cache = create_cache_backend(
+    settings.cache.article_cache_backend,
+    settings.cache.article_cache_size,
+    settings.cache.redis_url,
+)
+
+article_cache_stats = CacheStats()
+
+search_flight = (
+    SingleFlight(
+        ttl=settings.cache.search_result_ttl_seconds,
+        maxsize=settings.cache.search_result_cache_size,
+    )
+    if settings.cache.search_coalescing
+    else None
+)
+
+
+def article_service(uow: unit_of_work):
+    if article_cache is None:
+        return ArticleService(
+            ArticleRepository(uow, uow.read_session_factory, db.read_session_factory)
+        )
+
+    return ArticleService(
+        CachedArticleRepository(
+            uow,
+            article_cache,
+            article_cache_stats,
+            settings.cache.article_cache_ttl_seconds,
+            uow.read_session_factory,
+            db.read_session_factory,
+        )
+    )
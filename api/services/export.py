@@ -0,0 +1,48 @@
+import csv
+import io
+from typing import AsyncIterator, Type
+
+from pydantic import BaseModel
+
+flush_size = 64 * 1024
+
+
+async def iter_ndjson(
+    items: AsyncIterator, schema: Type[BaseModel]
+) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    first = True
+    async for item in items:
+        buffer += schema.model_validate(item).model_dump_json().encode()
+        buffer += b"\n"
+        if first or len(buffer) >= flush_size:
+            yield bytes(buffer)
+            buffer.clear()
+            first = False
+
+    if buffer:
+        yield bytes(buffer)
+
+
+async def iter_csv(
+    items: AsyncIterator, schema: Type[BaseModel]
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    fields = list(schema.model_fields)
+
+    writer.writerow(fields)
+    yield buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+
+    async for item in items:
+        row = schema.model_validate(item).model_dump(mode="json")
+        writer.writerow([row[field] for field in fields])
+        if buffer.tell() >= flush_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
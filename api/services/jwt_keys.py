@@ -0,0 +1,65 @@
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from jwt.algorithms import get_default_algorithms
+
+
+class JWTKeyStore:
+    def __init__(
+        self,
+        private_key_path: Path,
+        public_key_path: Path,
+        algorithm: str,
+        reload_interval: float = 0,
+    ) -> None:
+        self.private_key_path = private_key_path
+        self.public_key_path = public_key_path
+        self.algorithm = algorithm
+        self.reload_interval = reload_interval
+        self.version = 0
+
+        self._private_key: Optional[Any] = None
+        self._public_key: Optional[Any] = None
+        self._mtimes: Optional[Tuple[float, float]] = None
+        self._checked_at = 0.0
+
+    @property
+    def private_key(self) -> Any:
+        self._reload_if_rotated()
+        return self._private_key
+
+    @property
+    def public_key(self) -> Any:
+        self._reload_if_rotated()
+        return self._public_key
+
+    def reload(self) -> None:
+        algorithm = get_default_algorithms()[self.algorithm]
+        self._mtimes = self._read_mtimes()
+        self._private_key = algorithm.prepare_key(self.private_key_path.read_text())
+        self._public_key = algorithm.prepare_key(self.public_key_path.read_text())
+        self._checked_at = time.monotonic()
+        self.version += 1
+
+    def _reload_if_rotated(self) -> None:
+        if self._mtimes is None:
+            self.reload()
+            return
+
+        if not self.reload_interval:
+            return
+
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+
+        self._checked_at = now
+        if self._read_mtimes() != self._mtimes:
+            self.reload()
+
+    def _read_mtimes(self) -> Tuple[float, float]:
+        return (
+            self.private_key_path.stat().st_mtime,
+            self.public_key_path.stat().st_mtime,
+        )
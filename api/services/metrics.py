@@ -0,0 +1,128 @@
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from utils.metrics import Counter, Gauge, Histogram, render
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status.",
+    ("method", "route", "status"),
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Database statement latency by statement type.",
+    ("statement",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+db_query_errors = Counter(
+    "db_query_errors", "Database statements that raised.", ("statement",)
+)
+
+StatsSource = Callable[[], Optional[Dict[str, Any]]]
+
+stats_sources: Dict[str, Tuple[StatsSource, frozenset]] = {}
+
+
+def register_stats(
+    name: str, source: StatsSource, counters: Sequence[str] = ()
+) -> None:
+    stats_sources[name] = (source, frozenset(counters))
+
+
+def stats_metrics() -> Iterable[Counter]:
+    for source_name, (source, counters) in stats_sources.items():
+        stats = source()
+        if not stats:
+            continue
+
+        for key, value in stats.items():
+            if isinstance(value, (int, float)):
+                metric_type = Counter if key in counters else Gauge
+                metric = metric_type(f"{source_name}_{key}", f"{source_name} {key}.")
+                metric.inc(amount=value)
+                yield metric
+
+
+def render_metrics() -> bytes:
+    metrics: List = [
+        http_request_duration,
+        http_requests_in_flight,
+        db_query_duration,
+        db_query_errors,
+    ]
+    metrics.extend(stats_metrics())
+    return render(metrics)
+
+
+def statement_type(statement: str) -> str:
+    parts = statement.lstrip().split(None, 1)
+    return parts[0].upper() if parts else ""
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        context.query_started_at = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        db_query_duration.observe(
+            statement_type(statement),
+            value=time.perf_counter() - context.query_started_at,
+        )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(exception_context):
+        if exception_context.statement:
+            db_query_errors.inc(statement_type(exception_context.statement))
+
+
+class MetricsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+        self.route_templates: Optional[Dict[Any, str]] = None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            http_request_duration.observe(
+                scope["method"],
+                self.__route_template(scope),
+                str(status_code),
+                value=time.perf_counter() - started_at,
+            )
+
+    def __route_template(self, scope) -> str:
+        if self.route_templates is None:
+            self.route_templates = {
+                route.endpoint: route.path
+                for route in scope["app"].routes
+                if hasattr(route, "endpoint")
+            }
+        return self.route_templates.get(scope.get("endpoint"), UNMATCHED_ROUTE)
@@ -0,0 +1,45 @@
+import base64
+import json
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette import status
+
+from configs.config import settings
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return settings.pagination.default_limit
+    return min(limit, settings.pagination.max_limit)
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], *types: type) -> Optional[Tuple]:
+    if not cursor:
+        return None
+
+    invalid_cursor_exp = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor",
+    )
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise invalid_cursor_exp
+
+    if not isinstance(values, list) or len(values) != len(types):
+        raise invalid_cursor_exp
+
+    for value, value_type in zip(values, types):
+        if value_type is float and isinstance(value, int):
+            continue
+        if not isinstance(value, value_type) or isinstance(value, bool):
+            raise invalid_cursor_exp
+
+    return tuple(values)
@@ -0,0 +1,120 @@
+import logging
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+placeholder_pattern = re.compile(r"\$\d+(?:::\w+(?:\[\])?)?|%\(\w+\)s|\?")
+placeholder_list_pattern = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def statement_shape(statement: str) -> str:
+    shape = placeholder_pattern.sub("?", statement)
+    shape = placeholder_list_pattern.sub("?", shape)
+    return " ".join(shape.split())
+
+
+class RequestQueryStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Dict[str, int] = {}
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        shape = statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        return [
+            (shape, count) for shape, count in self.shapes.items() if count >= threshold
+        ]
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries", '
+            f"app;dur={total * 1000:.2f}"
+        )
+
+
+request_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+
+def track_request_queries(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if request_query_stats.get() is not None:
+            context.request_query_started_at = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        stats = request_query_stats.get()
+        started_at = getattr(context, "request_query_started_at", None)
+        if stats is not None and started_at is not None:
+            stats.record(statement, time.perf_counter() - started_at)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app, n_plus_one_threshold: int) -> None:
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = request_query_stats.set(stats)
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    stats.server_timing(time.perf_counter() - started_at),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_query_stats.reset(token)
+            self.__log(scope, status_code, stats, time.perf_counter() - started_at)
+
+    def __log(
+        self, scope, status_code: int, stats: RequestQueryStats, duration: float
+    ) -> None:
+        repeated = stats.repeated(self.n_plus_one_threshold)
+        level = logging.WARNING if repeated else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "db_queries": stats.count,
+            "db_ms": round(stats.duration * 1000, 2),
+            "n_plus_one": [
+                {"statement": shape, "count": count} for shape, count in repeated
+            ],
+        }
+        logger.log(level, orjson.dumps(record).decode())
@@ -0,0 +1,157 @@
+import asyncio
+import datetime
+import logging
+import random
+import sys
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+import orjson
+from greenlet import getcurrent
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from configs.config import settings
+from services.metrics import statement_type
+
+logger = logging.getLogger(__name__)
+
+capturing_plan: ContextVar[bool] = ContextVar("capturing_plan", default=False)
+
+max_parameter_length = 200
+
+
+def describe_parameter(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    if isinstance(value, (list, tuple)):
+        return [describe_parameter(item) for item in value]
+    if isinstance(value, str) and len(value) > max_parameter_length:
+        return value[:max_parameter_length] + "..."
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def repository_origin() -> Optional[str]:
+    # Cursor events run in the greenlet SQLAlchemy spawns for the async
+    # driver; the awaiting repository coroutine is suspended in its parent.
+    current = getcurrent()
+    frame = current.parent.gr_frame if current.parent else sys._getframe()
+    while frame is not None:
+        if frame.f_globals.get("__name__", "").startswith("repositories."):
+            return frame.f_code.co_qualname
+        frame = frame.f_back
+    return None
+
+
+class SlowQueryLog:
+    def __init__(
+        self,
+        threshold_ms: Optional[float],
+        explain_sample_rate: float,
+        explain_analyze: bool,
+        maxsize: int,
+    ) -> None:
+        self.threshold_ms = threshold_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.explain_analyze = explain_analyze
+        self.entries: Deque[Dict[str, Any]] = deque(maxlen=maxsize)
+        self.total = 0
+        self.explained = 0
+        self._captures: set = set()
+
+    def record(
+        self,
+        engine: AsyncEngine,
+        statement: str,
+        parameters: Any,
+        duration: float,
+        many: bool,
+    ) -> None:
+        self.total += 1
+        entry = {
+            "at": datetime.datetime.now(datetime.UTC).isoformat(),
+            "duration_ms": round(duration * 1000, 2),
+            "origin": repository_origin(),
+            "statement": statement,
+            "parameters": None if many else describe_parameter(parameters),
+            "executemany": many,
+            "plan": None,
+        }
+        self.entries.append(entry)
+        logger.warning(
+            "Slow query (%.2f ms) from %s: %s",
+            entry["duration_ms"],
+            entry["origin"],
+            " ".join(statement.split()),
+        )
+
+        if not many and random.random() < self.explain_sample_rate:
+            self.explained += 1
+            task = asyncio.ensure_future(
+                self.__capture_plan(engine, entry, statement, parameters)
+            )
+            self._captures.add(task)
+            task.add_done_callback(self._captures.discard)
+
+    async def __capture_plan(
+        self,
+        engine: AsyncEngine,
+        entry: Dict[str, Any],
+        statement: str,
+        parameters: Any,
+    ) -> None:
+        capturing_plan.set(True)
+        analyze = self.explain_analyze and statement_type(statement) == "SELECT"
+        options = "ANALYZE, BUFFERS, " if analyze else ""
+        try:
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN ({options}FORMAT JSON) {statement}", parameters
+                )
+                entry["plan"] = orjson.loads(result.scalar())
+                await conn.rollback()
+        except Exception as exc:
+            entry["plan"] = {"error": str(exc)}
+
+    def recent(self) -> List[Dict[str, Any]]:
+        return list(reversed(self.entries))
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self.entries),
+            "total": self.total,
+            "explained": self.explained,
+        }
+
+
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.db.slow_query_threshold_ms,
+    explain_sample_rate=settings.db.slow_query_explain_sample_rate,
+    explain_analyze=settings.db.slow_query_explain_analyze,
+    maxsize=settings.db.slow_query_log_size,
+)
+
+
+def track_slow_queries(engine: AsyncEngine, slow_query_log: SlowQueryLog) -> None:
+    if slow_query_log.threshold_ms is None:
+        return
+
+    threshold = slow_query_log.threshold_ms / 1000
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        context.slow_query_started_at = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        duration = time.perf_counter() - context.slow_query_started_at
+        if duration >= threshold and not capturing_plan.get():
+            slow_query_log.record(engine, statement, parameters, duration, many)
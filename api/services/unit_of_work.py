@@ -0,0 +1,14 @@
+from typing import Annotated, AsyncIterator
+
+from fastapi import Depends
+
+from models import db
+from models.db import UnitOfWork
+
+
+async def get_unit_of_work() -> AsyncIterator[UnitOfWork]:
+    async with db.unit_of_work() as uow:
+        yield uow
+
+
+unit_of_work = Annotated[UnitOfWork, Depends(get_unit_of_work)]
@@ -1,12 +1,13 @@
 from datetime import timedelta
 import datetime
-from typing import Annotated
+import hashlib
+from typing import Annotated, Union
 
 from typing_extensions import Optional
-import bcrypt
 import jwt
 from jwt.exceptions import PyJWTError
 from fastapi import HTTPException, Depends, Security
+from pydantic import ValidationError
 from fastapi.security import APIKeyCookie
 from starlette import status
 from configs.config import settings
@@ -14,6 +15,31 @@ from models import db, User
 from repositories.abc_repositories import AbstractUserRepository
 from repositories.sqlalchemy.user_repository import UserRepository
 from schemas.auth_schemas import AuthResponse, UserSchema
+from utils.cache import LRUCache
+from services.jwt_keys import JWTKeyStore
+from services.password_hasher import PasswordHasher
+from services.unit_of_work import unit_of_work
+
+jwt_keys = JWTKeyStore(
+    private_key_path=settings.jwt.private_key_path,
+    public_key_path=settings.jwt.public_key_path,
+    algorithm=settings.jwt.algorithm,
+    reload_interval=settings.jwt.key_reload_interval_seconds,
+)
+
+verified_tokens = LRUCache(maxsize=settings.jwt.verified_token_cache_size)
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hashing.workers,
+    max_pending=settings.password_hashing.max_pending,
+    rounds=settings.password_hashing.bcrypt_rounds,
+    use_processes=settings.password_hashing.use_processes,
+)
+
+user_cache = LRUCache(
+    maxsize=settings.cache.user_cache_size,
+    ttl=settings.cache.user_cache_ttl_seconds,
+)
 
 
 class UserService:
@@ -31,9 +57,13 @@ class UserService:
         if not user_from_db:
             raise unauth_exp
 
-        if not self.verify_password(password, user_from_db.hashed_password):
+        if not await self.verify_password(password, user_from_db.hashed_password):
             raise unauth_exp
-        jwt_payload = {"sub": user_from_db.id, "email": user_from_db.email}
+
+        return self.__make_auth_response(user_from_db)
+
+    def __make_auth_response(self, user: User) -> AuthResponse:
+        jwt_payload = self.make_jwt_payload(user)
 
         access_token = self.encode_jwt(jwt_payload)
         refresh_token = self.encode_jwt(
@@ -44,7 +74,7 @@ class UserService:
         return AuthResponse(
             access_token=access_token,
             refresh_token=refresh_token,
-            user=UserSchema.model_validate(user_from_db),
+            user=UserSchema.model_validate(user),
         )
 
     async def create_user(self, email: str, name: str, password: str) -> AuthResponse:
@@ -56,13 +86,16 @@ class UserService:
                 detail="Username already registered",
             )
 
-        hashed_password = self.hash_password(password)
-        await self.user_repo.create_user(email, name, hashed_password)
+        hashed_password = await self.hash_password(password)
+        new_user = await self.user_repo.create_user(email, name, hashed_password)
+        db.pin_to_primary(new_user.id)
 
-        return await self.login_user(email, password)
+        # The new row is not committed until the request's unit of work ends,
+        # so tokens are issued from it directly instead of logging in again.
+        return self.__make_auth_response(new_user)
 
     async def refresh_access_token(self, refresh_token: str) -> AuthResponse:
-        user = await self.auth_user_by_token(refresh_token)
+        user = await self.auth_user_by_token(refresh_token, use_cache=False)
 
         payload = self.decode_jwt(refresh_token)
 
@@ -74,7 +107,7 @@ class UserService:
                 detail="Refresh token is expired",
             )
 
-        jwt_payload = {"sub": user.id, "email": user.email}
+        jwt_payload = self.make_jwt_payload(user)
 
         access_token = self.encode_jwt(jwt_payload)
         refresh_token = self.encode_jwt(
@@ -88,7 +121,9 @@ class UserService:
             user=UserSchema(id=user.id, email=user.email, name=user.name),
         )
 
-    async def auth_user_by_token(self, token: str) -> Optional[User]:
+    async def auth_user_by_token(
+        self, token: str, use_cache: bool = True
+    ) -> Optional[Union[User, UserSchema]]:
         unauth_exp = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect token",
@@ -107,10 +142,6 @@ class UserService:
         if not user_id:
             raise unauth_exp
 
-        user = await self.user_repo.get_user_by_id(user_id)
-        if not user:
-            raise unauth_exp
-
         expired_date = decoded.get("exp")
         if not expired_date:
             raise unauth_exp
@@ -120,8 +151,40 @@ class UserService:
         ) < datetime.datetime.now(datetime.UTC):
             raise expired_token_exp
 
+        db.route_reads_for(user_id)
+
+        if use_cache and settings.jwt.stateless_identity:
+            principal = self.principal_from_claims(decoded)
+            if principal is not None:
+                return principal
+
+        if use_cache:
+            user = await self.user_repo.get_cached_user_by_id(user_id)
+        else:
+            user = await self.user_repo.get_user_by_id(user_id)
+        if not user:
+            raise unauth_exp
+
         return user
 
+    @staticmethod
+    def make_jwt_payload(user: Union[User, UserSchema]) -> dict:
+        payload = {"sub": user.id, "email": user.email}
+        if settings.jwt.stateless_identity:
+            payload["name"] = user.name
+        return payload
+
+    @staticmethod
+    def principal_from_claims(claims: dict) -> Optional[UserSchema]:
+        if "email" not in claims or "name" not in claims:
+            return None
+        try:
+            return UserSchema(
+                id=claims["sub"], email=claims["email"], name=claims["name"]
+            )
+        except ValidationError:
+            return None
+
     @staticmethod
     def encode_jwt(
         payload: dict,
@@ -131,7 +194,7 @@ class UserService:
         expire_timedelta: Optional[timedelta] = None,
     ):
         if not private_key:
-            private_key = settings.jwt.private_key_path.read_text()
+            private_key = jwt_keys.private_key
 
         if not algorithm:
             algorithm = settings.jwt.algorithm
@@ -159,28 +222,38 @@ class UserService:
         public_key: Optional[str] = None,
         algorithm: Optional[str] = None,
     ):
-        if not public_key:
-            public_key = settings.jwt.public_key_path.read_text()
+        if public_key or (algorithm and algorithm != settings.jwt.algorithm):
+            return jwt.decode(
+                token,
+                public_key or jwt_keys.public_key,
+                algorithms=[algorithm or settings.jwt.algorithm],
+            )
 
-        if not algorithm:
-            algorithm = settings.jwt.algorithm
+        public_key = jwt_keys.public_key
+        cache_key = (jwt_keys.version, hashlib.sha256(token.encode()).digest())
 
-        decoded = jwt.decode(token, public_key, algorithms=[algorithm])
+        decoded = verified_tokens.get(cache_key)
+        if decoded is None:
+            decoded = jwt.decode(token, public_key, algorithms=[settings.jwt.algorithm])
+            verified_tokens.set(cache_key, decoded, expires_at=decoded.get("exp"))
 
-        return decoded
+        return dict(decoded)
 
     @staticmethod
-    def hash_password(password: str) -> bytes:
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode(), salt)
+    async def hash_password(password: str) -> bytes:
+        return await password_hasher.hash(password)
 
     @staticmethod
-    def verify_password(password: str, hashed_password: bytes) -> bool:
-        return bcrypt.checkpw(password.encode(), hashed_password)
+    async def verify_password(password: str, hashed_password: bytes) -> bool:
+        return await password_hasher.verify(password, hashed_password)
 
 
-def user_service():
-    return UserService(UserRepository(db.session_factory))
+def user_service(uow: unit_of_work):
+    # Lookups before bcrypt and per-request auth use short-lived sessions so no
+    # connection is held while a password is hashed or another query waits.
+    return UserService(
+        UserRepository(uow, user_cache, db.read_session_factory, db.session_factory)
+    )
 
 
 auth_scheme = APIKeyCookie(name="access_token")
@@ -193,4 +266,15 @@ async def get_user(
     return await u_service.auth_user_by_token(token)
 
 
-current_user = Annotated[User, Depends(get_user)]
+current_user = Annotated[Union[User, UserSchema], Depends(get_user)]
+
+
+async def get_admin_user(user: current_user):
+    if user.email not in settings.admin.emails:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required"
+        )
+    return user
+
+
+admin_user = Annotated[Union[User, UserSchema], Depends(get_admin_user)]
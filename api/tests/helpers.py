@@ -0,0 +1,10 @@
+import asyncio
+from typing import AsyncContextManager, Awaitable, Callable
+
+
+def run_with(resource: AsyncContextManager, test: Callable[..., Awaitable]) -> None:
+    async def main():
+        async with resource as value:
+            await test(value)
+
+    asyncio.run(main())
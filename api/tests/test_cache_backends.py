@@ -0,0 +1,226 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import pytest
+
+from utils.cache_backends import (
+    MemoryCacheBackend,
+    RedisCacheBackend,
+    RedisError,
+    create_cache_backend,
+)
+from tests.helpers import run_with
+
+
+class RedisStandIn:
+    def __init__(self, password: Optional[str] = None) -> None:
+        self.password = password
+        self.data: Dict[bytes, bytes] = {}
+        self.expires: Dict[bytes, int] = {}
+        self.commands: List[List[bytes]] = []
+        self.connections = 0
+        self.stalled_keys: set = set()
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{port}/2"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer) -> None:
+        self.connections += 1
+        authenticated = self.password is None
+        try:
+            while True:
+                command = await self.read_command(reader)
+                self.commands.append(command)
+                name = command[0].upper()
+                if name == b"AUTH":
+                    authenticated = command[1].decode() == self.password
+                    reply = b"+OK\r\n" if authenticated else b"-ERR invalid\r\n"
+                elif not authenticated:
+                    reply = b"-NOAUTH Authentication required.\r\n"
+                elif name == b"SELECT":
+                    reply = b"+OK\r\n"
+                elif name == b"GET":
+                    if command[1] in self.stalled_keys:
+                        await asyncio.sleep(0.2)
+                    value = self.data.get(command[1])
+                    reply = (
+                        b"$-1\r\n"
+                        if value is None
+                        else b"$%d\r\n%s\r\n" % (len(value), value)
+                    )
+                elif name == b"SET":
+                    self.data[command[1]] = command[2]
+                    if len(command) == 5 and command[3].upper() == b"EX":
+                        self.expires[command[1]] = int(command[4])
+                    reply = b"+OK\r\n"
+                elif name == b"DEL":
+                    reply = b":%d\r\n" % int(
+                        self.data.pop(command[1], None) is not None
+                    )
+                else:
+                    reply = b"-ERR unknown command\r\n"
+                writer.write(reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def read_command(reader) -> List[bytes]:
+        count = int((await reader.readuntil(b"\r\n"))[1:-2])
+        command = []
+        for _ in range(count):
+            length = int((await reader.readuntil(b"\r\n"))[1:-2])
+            command.append((await reader.readexactly(length + 2))[:-2])
+        return command
+
+
+@asynccontextmanager
+async def redis_backend(
+    password: Optional[str] = None,
+) -> AsyncIterator[Tuple[RedisCacheBackend, RedisStandIn]]:
+    stand_in = RedisStandIn(password)
+    url = await stand_in.start()
+    backend = RedisCacheBackend(url, timeout=1.0)
+    try:
+        yield backend, stand_in
+    finally:
+        await backend.close()
+        await stand_in.stop()
+
+
+def test_memory_backend_get_set_delete():
+    async def main():
+        backend = MemoryCacheBackend(maxsize=2)
+        assert await backend.get("a") is None
+
+        await backend.set("a", b"1")
+        assert await backend.get("a") == b"1"
+
+        await backend.delete("a")
+        assert await backend.get("a") is None
+
+    asyncio.run(main())
+
+
+def test_memory_backend_evicts_least_recently_used():
+    async def main():
+        backend = MemoryCacheBackend(maxsize=2)
+        await backend.set("a", b"1")
+        await backend.set("b", b"2")
+        await backend.get("a")
+        await backend.set("c", b"3")
+
+        assert await backend.get("a") == b"1"
+        assert await backend.get("b") is None
+        assert await backend.get("c") == b"3"
+
+    asyncio.run(main())
+
+
+def test_memory_backend_expires_entries(monkeypatch):
+    async def main():
+        backend = MemoryCacheBackend(maxsize=2)
+        await backend.set("a", b"1", ttl=10)
+        assert await backend.get("a") == b"1"
+
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 11)
+        assert await backend.get("a") is None
+
+    asyncio.run(main())
+
+
+def test_redis_backend_get_set_delete():
+    async def test(redis):
+        backend, stand_in = redis
+        assert await backend.get("article:1") is None
+
+        await backend.set("article:1", b'{"id":1}', ttl=300)
+        assert await backend.get("article:1") == b'{"id":1}'
+        assert stand_in.expires[b"article:1"] == 300
+
+        await backend.delete("article:1")
+        assert await backend.get("article:1") is None
+        assert stand_in.connections == 1
+
+    run_with(redis_backend(), test)
+
+
+def test_redis_backend_authenticates_and_selects_db():
+    async def test(redis):
+        backend, stand_in = redis
+        await backend.set("key", b"value")
+
+        assert stand_in.commands[:2] == [[b"AUTH", b"secret"], [b"SELECT", b"2"]]
+        assert await backend.get("key") == b"value"
+
+    run_with(redis_backend(password="secret"), test)
+
+
+def test_redis_backend_raises_error_replies():
+    async def test(redis):
+        backend, stand_in = redis
+        with pytest.raises(RedisError):
+            await backend.execute("NOPE")
+
+        assert await backend.get("key") is None
+
+    run_with(redis_backend(), test)
+
+
+def test_redis_backend_drops_connection_after_cancelled_command():
+    async def test(redis):
+        backend, stand_in = redis
+        await backend.set("article:1", b"one")
+        await backend.set("article:2", b"two")
+        stand_in.stalled_keys.add(b"article:1")
+
+        task = asyncio.ensure_future(backend.get("article:1"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        stand_in.stalled_keys.clear()
+        assert await backend.get("article:2") == b"two"
+        assert stand_in.connections == 2
+
+    run_with(redis_backend(), test)
+
+
+def test_redis_backend_drops_connection_after_timeout():
+    async def test(redis):
+        backend, stand_in = redis
+        backend.timeout = 0.05
+        await backend.set("article:1", b"one")
+        await backend.set("article:2", b"two")
+        stand_in.stalled_keys.add(b"article:1")
+
+        with pytest.raises(asyncio.TimeoutError):
+            await backend.get("article:1")
+
+        backend.timeout = 1.0
+        assert await backend.get("article:2") == b"two"
+
+    run_with(redis_backend(), test)
+
+
+def test_create_cache_backend():
+    assert isinstance(create_cache_backend("memory", 10, None), MemoryCacheBackend)
+    assert isinstance(
+        create_cache_backend("redis", 10, "redis://localhost:6379/0"),
+        RedisCacheBackend,
+    )
+    assert create_cache_backend("none", 10, None) is None
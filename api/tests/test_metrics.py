@@ -0,0 +1,42 @@
+from services import metrics
+from utils.metrics import Counter, Gauge, render
+
+
+def test_counter_family_is_named_after_its_total_sample():
+    errors = Counter(
+        "db_query_errors", "Database statements that raised.", ("statement",)
+    )
+    errors.inc("SELECT")
+
+    assert render([errors]).decode().splitlines() == [
+        "# HELP db_query_errors_total Database statements that raised.",
+        "# TYPE db_query_errors_total counter",
+        'db_query_errors_total{statement="SELECT"} 1',
+    ]
+
+
+def test_gauge_keeps_its_name():
+    in_flight = Gauge("http_requests_in_flight", "In flight.")
+    in_flight.set(value=3)
+
+    assert render([in_flight]).decode().splitlines() == [
+        "# HELP http_requests_in_flight In flight.",
+        "# TYPE http_requests_in_flight gauge",
+        "http_requests_in_flight 3",
+    ]
+
+
+def test_stats_export_monotonic_keys_as_counters(monkeypatch):
+    monkeypatch.setattr(metrics, "stats_sources", {})
+    metrics.register_stats(
+        "user_cache", lambda: {"size": 2, "hits": 5}, counters=("hits",)
+    )
+
+    assert render(metrics.stats_metrics()).decode().splitlines() == [
+        "# HELP user_cache_size user_cache size.",
+        "# TYPE user_cache_size gauge",
+        "user_cache_size 2",
+        "# HELP user_cache_hits_total user_cache hits.",
+        "# TYPE user_cache_hits_total counter",
+        "user_cache_hits_total 5",
+    ]
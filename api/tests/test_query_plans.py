@@ -0,0 +1,139 @@
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Tuple
+
+import orjson
+import pytest
+from sqlalchemy import event, func, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from models import Article
+from models.db import DatabaseHelper
+from repositories.sqlalchemy.article_repository import ArticleRepository
+from tests.helpers import run_with
+
+# Points at a database seeded with `python -m benchmarks seed`; planners only
+# prefer indexes once the tables are big enough, so an empty schema proves nothing.
+SEEDED_DB_URL = os.environ.get("TEST_SEEDED_DB_URL")
+
+pytestmark = pytest.mark.skipif(
+    not SEEDED_DB_URL, reason="TEST_SEEDED_DB_URL is not set"
+)
+
+CHECKED_TABLES = ("articles", "problems")
+
+Probe = Callable[[ArticleRepository, Article], Awaitable[Any]]
+
+
+def first_word(sample: Article) -> str:
+    return sample.name.split()[-1]
+
+
+PROBES: Dict[str, Probe] = {
+    "get_article_by_id": lambda repo, sample: repo.get_article_by_id(sample.id),
+    "get_article_version": lambda repo, sample: repo.get_article_version(sample.id),
+    "get_article_by_name": lambda repo, sample: repo.get_article_by_name(sample.name),
+    "get_article_by_identifier": lambda repo, sample: repo.get_article_by_identifier(
+        sample.identifier
+    ),
+    "get_all_articles_by_user_id": lambda repo, sample: (
+        repo.get_all_articles_by_user_id(sample.user_id, None, 51)
+    ),
+    "search": lambda repo, sample: repo.search(None, None, None, None, sample.id, 51),
+    "search_by_term": lambda repo, sample: repo.search(
+        sample._term, None, None, None, None, 51
+    ),
+    "search_by_year": lambda repo, sample: repo.search(
+        None, None, None, sample.publication_year, None, 51
+    ),
+    "search_by_name": lambda repo, sample: repo.search(
+        None, first_word(sample), None, None, None, 51
+    ),
+    "search_by_author": lambda repo, sample: repo.search(
+        None, None, sample.author, None, None, 51
+    ),
+    "full_text_search": lambda repo, sample: repo.full_text_search(
+        first_word(sample), None, None, None, None, None, 51
+    ),
+    "similarity_search": lambda repo, sample: repo.similarity_search(
+        None, sample.name, None, None, None, 51
+    ),
+}
+
+
+def sequential_scans(plan: Dict) -> Iterable[str]:
+    relation = plan.get("Relation Name")
+    if plan.get("Node Type") == "Seq Scan" and relation in CHECKED_TABLES:
+        yield relation
+    for child in plan.get("Plans", ()):
+        yield from sequential_scans(child)
+
+
+async def capture_statements(engine: AsyncEngine, probe) -> List[Tuple[str, Any]]:
+    statements: List[Tuple[str, Any]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        await probe()
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+@asynccontextmanager
+async def seeded_database() -> AsyncIterator[DatabaseHelper]:
+    db = DatabaseHelper(SEEDED_DB_URL, replica_urls=[])
+    try:
+        yield db
+    finally:
+        await db.dispose()
+
+
+@pytest.fixture(scope="module")
+def sample() -> Article:
+    samples = []
+
+    async def load_sample(db):
+        async with db.engine.connect() as conn:
+            await conn.execute(text("ANALYZE articles"))
+            await conn.execute(text("ANALYZE problems"))
+            await conn.commit()
+
+        async with db.session_factory() as session:
+            article_count = await session.scalar(select(func.count(Article.id)))
+            samples.append(
+                await session.scalar(
+                    select(Article)
+                    .order_by(Article.id)
+                    .offset(article_count // 2)
+                    .limit(1)
+                )
+            )
+
+    run_with(seeded_database(), load_sample)
+    if samples[0] is None:
+        pytest.fail("The articles table is empty, seed the corpus first")
+    return samples[0]
+
+
+@pytest.mark.parametrize("name", list(PROBES))
+def test_repository_queries_avoid_sequential_scans(sample, name):
+    async def test(db):
+        repo = ArticleRepository(db.session_factory)
+        statements = await capture_statements(
+            db.engine, lambda: PROBES[name](repo, sample)
+        )
+        assert statements
+
+        async with db.engine.connect() as conn:
+            for statement, parameters in statements:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = orjson.loads(result.scalar())[0]["Plan"]
+                assert not list(sequential_scans(plan)), " ".join(statement.split())
+
+    run_with(seeded_database(), test)
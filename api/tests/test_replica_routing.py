@@ -0,0 +1,221 @@
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import AsyncIterator, Sequence
+
+import pytest
+from sqlalchemy import text
+
+from configs.config import settings
+from models.db import DatabaseHelper
+from tests.helpers import run_with
+
+# models/__init__.py re-exports the DatabaseHelper instance as models.db,
+# which shadows the module attribute.
+db_module = sys.modules["models.db"]
+
+
+@pytest.fixture
+def sqlite_urls(tmp_path):
+    def make(name: str) -> str:
+        return f"sqlite+aiosqlite:///{tmp_path / name}.db"
+
+    return make
+
+
+@asynccontextmanager
+async def database(
+    primary_url: str, replica_urls: Sequence[str]
+) -> AsyncIterator[DatabaseHelper]:
+    db = DatabaseHelper(primary_url, replica_urls=replica_urls)
+    try:
+        yield db
+    finally:
+        await db.dispose()
+
+
+def bound_engine(session):
+    return session.bind
+
+
+def test_reads_use_primary_without_replicas(sqlite_urls):
+    async def test(db):
+        assert bound_engine(db.read_session_factory()) is db.engine
+
+    run_with(database(sqlite_urls("primary"), []), test)
+
+
+def test_reads_rotate_across_replicas(sqlite_urls):
+    async def test(db):
+        engines = [bound_engine(db.read_session_factory()) for _ in range(4)]
+        assert engines == db.replica_engines * 2
+
+    run_with(
+        database(sqlite_urls("primary"), [sqlite_urls("r0"), sqlite_urls("r1")]), test
+    )
+
+
+def test_pinned_reader_reads_from_primary(sqlite_urls):
+    async def test(db):
+        db.route_reads_for(1)
+        assert bound_engine(db.read_session_factory()) is db.replica_engines[0]
+
+        db.pin_to_primary(1)
+        assert db.is_pinned_to_primary()
+        assert bound_engine(db.read_session_factory()) is db.engine
+
+        db.route_reads_for(2)
+        assert not db.is_pinned_to_primary()
+        assert bound_engine(db.read_session_factory()) is db.replica_engines[0]
+
+    run_with(database(sqlite_urls("primary"), [sqlite_urls("r0")]), test)
+
+
+def test_primary_commit_pins_the_current_reader(sqlite_urls):
+    async def test(db):
+        db.route_reads_for(7)
+        async with db.session_factory() as session:
+            await session.execute(text("CREATE TABLE t (x INTEGER)"))
+            await session.commit()
+
+        assert db.is_pinned_to_primary()
+
+    run_with(database(sqlite_urls("primary"), [sqlite_urls("r0")]), test)
+
+
+def test_read_only_commit_does_not_pin(sqlite_urls):
+    async def test(db):
+        db.route_reads_for(7)
+        async with db.session_factory() as session:
+            await session.execute(text("SELECT 1"))
+            await session.commit()
+
+        assert not db.is_pinned_to_primary()
+
+    run_with(database(sqlite_urls("primary"), [sqlite_urls("r0")]), test)
+
+
+def test_rolled_back_write_does_not_pin_a_later_read(sqlite_urls):
+    async def test(db):
+        db.route_reads_for(7)
+        async with db.session_factory() as session:
+            await session.execute(text("CREATE TABLE t (x INTEGER)"))
+            await session.rollback()
+            await session.execute(text("SELECT 1"))
+            await session.commit()
+
+        assert not db.is_pinned_to_primary()
+
+    run_with(database(sqlite_urls("primary"), [sqlite_urls("r0")]), test)
+
+
+def test_pin_expires(sqlite_urls, monkeypatch):
+    async def test(db):
+        db.route_reads_for(1)
+        db.pin_to_primary(1)
+
+        now = time.time()
+        monkeypatch.setattr(
+            time, "time", lambda: now + settings.db.read_your_writes_seconds + 1
+        )
+        assert not db.is_pinned_to_primary()
+
+    run_with(database(sqlite_urls("primary"), [sqlite_urls("r0")]), test)
+
+
+def test_ejected_replica_is_skipped_until_retry(sqlite_urls, monkeypatch):
+    async def test(db):
+        db.eject_replica(0)
+        engines = {bound_engine(db.read_session_factory()) for _ in range(4)}
+        assert engines == {db.replica_engines[1]}
+
+        now = time.monotonic()
+        monkeypatch.setattr(
+            time, "monotonic", lambda: now + settings.db.replica_retry_seconds + 1
+        )
+        engines = {bound_engine(db.read_session_factory()) for _ in range(4)}
+        assert engines == set(db.replica_engines)
+
+    run_with(
+        database(sqlite_urls("primary"), [sqlite_urls("r0"), sqlite_urls("r1")]), test
+    )
+
+
+def test_reads_fall_back_to_primary_when_all_replicas_are_ejected(sqlite_urls):
+    async def test(db):
+        db.eject_replica(0)
+        db.eject_replica(1)
+        assert bound_engine(db.read_session_factory()) is db.engine
+        assert [status["healthy"] for status in db.replica_status()] == [False, False]
+
+    run_with(
+        database(sqlite_urls("primary"), [sqlite_urls("r0"), sqlite_urls("r1")]), test
+    )
+
+
+def test_disconnect_errors_eject_the_replica(sqlite_urls):
+    async def test(db):
+        db._on_replica_error(
+            0, SimpleNamespace(is_disconnect=False, original_exception=ValueError())
+        )
+        assert db.replica_status()[0]["healthy"]
+
+        db._on_replica_error(
+            0, SimpleNamespace(is_disconnect=True, original_exception=None)
+        )
+        assert not db.replica_status()[0]["healthy"]
+
+    run_with(database(sqlite_urls("primary"), [sqlite_urls("r0")]), test)
+
+
+def test_health_check_ejects_lagging_and_restores_caught_up_replicas(
+    sqlite_urls, monkeypatch
+):
+    async def test(db):
+        monkeypatch.setattr(
+            db_module,
+            "replica_lag_query",
+            text(f"SELECT {settings.db.replica_max_lag_seconds + 1}"),
+        )
+        await db.check_replicas()
+        assert not db.replica_status()[0]["healthy"]
+
+        monkeypatch.setattr(db_module, "replica_lag_query", text("SELECT 0"))
+        await db.check_replicas()
+        assert db.replica_status()[0]["healthy"]
+
+    run_with(database(sqlite_urls("primary"), [sqlite_urls("r0")]), test)
+
+
+@asynccontextmanager
+async def hung_server() -> AsyncIterator[int]:
+    # Accepts TCP connections but never answers the Postgres handshake.
+    writers = []
+    server = await asyncio.start_server(
+        lambda reader, writer: writers.append(writer), "127.0.0.1", 0
+    )
+    try:
+        yield server.sockets[0].getsockname()[1]
+    finally:
+        for writer in writers:
+            writer.close()
+        server.close()
+        await server.wait_closed()
+
+
+def test_health_check_times_out_on_a_hung_replica(sqlite_urls, monkeypatch):
+    monkeypatch.setattr(settings.db, "replica_health_check_timeout", 0.2)
+
+    async def test(port):
+        async with database(
+            sqlite_urls("primary"),
+            [f"postgresql+asyncpg://u:p@127.0.0.1:{port}/db"],
+        ) as db:
+            started_at = time.perf_counter()
+            await db.check_replicas()
+            assert time.perf_counter() - started_at < 2
+            assert not db.replica_status()[0]["healthy"]
+
+    run_with(hung_server(), test)
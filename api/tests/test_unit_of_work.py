@@ -0,0 +1,169 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+
+import pytest
+from sqlalchemy import event, func, select, text
+
+from models import User
+from models.db import DatabaseHelper
+from repositories.sqlalchemy.user_repository import UserRepository
+from services import user_service
+from services.user_service import UserService
+from tests.helpers import run_with
+
+
+@pytest.fixture
+def sqlite_urls(tmp_path):
+    def make(name: str) -> str:
+        return f"sqlite+aiosqlite:///{tmp_path / name}.db"
+
+    return make
+
+
+@asynccontextmanager
+async def database(primary_url: str, *replica_urls: str) -> AsyncIterator:
+    db = DatabaseHelper(primary_url, replica_urls=list(replica_urls))
+    async with db.engine.begin() as conn:
+        await conn.run_sync(User.__table__.create)
+
+    commits: List[int] = []
+    event.listen(db.engine.sync_engine, "commit", lambda conn: commits.append(1))
+    try:
+        yield db, commits
+    finally:
+        await db.dispose()
+
+
+async def count_users(db: DatabaseHelper) -> int:
+    async with db.session_factory() as session:
+        return await session.scalar(select(func.count(User.id)))
+
+
+def add_user(session, email: str) -> None:
+    session.add(User(email=email, name=email, hashed_password=b"hash"))
+
+
+def test_read_only_unit_of_work_rolls_back_without_pinning(sqlite_urls):
+    async def test(database):
+        db, commits = database
+        db.route_reads_for(1)
+        async with db.unit_of_work() as uow:
+            async with uow() as session:
+                await session.execute(text("SELECT 1"))
+
+        assert commits == []
+        assert not db.is_pinned_to_primary()
+
+    run_with(database(sqlite_urls("primary"), sqlite_urls("r0")), test)
+
+
+def test_unit_of_work_commits_repository_writes_once(sqlite_urls):
+    async def test(database):
+        db, commits = database
+        db.route_reads_for(1)
+        async with db.unit_of_work() as uow:
+            for email in ("a@example.com", "b@example.com"):
+                async with uow() as session:
+                    add_user(session, email)
+                    await session.commit()
+
+            async with uow.read_session_factory() as session:
+                assert await session.scalar(select(func.count(User.id))) == 2
+            assert db.engine.pool.checkedout() == 1
+            assert commits == []
+
+        assert commits == [1]
+        assert await count_users(db) == 2
+        assert db.is_pinned_to_primary()
+
+    run_with(database(sqlite_urls("primary"), sqlite_urls("r0")), test)
+
+
+def test_unit_of_work_rolls_back_on_error(sqlite_urls):
+    async def test(database):
+        db, commits = database
+        with pytest.raises(RuntimeError):
+            async with db.unit_of_work() as uow:
+                async with uow() as session:
+                    add_user(session, "a@example.com")
+                    await session.commit()
+                raise RuntimeError
+
+        assert commits == []
+        assert await count_users(db) == 0
+
+    run_with(database(sqlite_urls("primary")), test)
+
+
+def test_after_transaction_callbacks_run_once_the_connection_is_released(
+    sqlite_urls,
+):
+    async def test(database):
+        db, _ = database
+        checked_out = []
+
+        async def callback():
+            checked_out.append(db.engine.pool.checkedout())
+
+        async with db.unit_of_work() as uow:
+            async with uow() as session:
+                add_user(session, "a@example.com")
+            uow.after_transaction(callback)
+
+        assert checked_out == [0]
+
+    run_with(database(sqlite_urls("primary")), test)
+
+
+def test_login_holds_no_connection_while_verifying_the_password(
+    sqlite_urls, monkeypatch
+):
+    async def test(database):
+        db, _ = database
+        async with db.session_factory() as session:
+            add_user(session, "a@example.com")
+            await session.commit()
+
+        checked_out = []
+
+        async def verify(password, hashed_password):
+            checked_out.append(db.engine.pool.checkedout())
+            return True
+
+        monkeypatch.setattr(user_service.password_hasher, "verify", verify)
+        monkeypatch.setattr(UserService, "encode_jwt", lambda *args, **kwargs: "jwt")
+
+        async with db.unit_of_work() as uow:
+            service = UserService(
+                UserRepository(uow, None, db.read_session_factory, db.session_factory)
+            )
+            response = await service.login_user("a@example.com", "password")
+
+        assert response.user.email == "a@example.com"
+        assert checked_out == [0]
+
+    run_with(database(sqlite_urls("primary")), test)
+
+
+def test_signup_issues_tokens_from_the_uncommitted_user(sqlite_urls, monkeypatch):
+    async def test(database):
+        db, commits = database
+
+        async def hash_password(password):
+            assert db.engine.pool.checkedout() == 0
+            return b"hash"
+
+        monkeypatch.setattr(user_service.password_hasher, "hash", hash_password)
+        monkeypatch.setattr(UserService, "encode_jwt", lambda *args, **kwargs: "jwt")
+
+        async with db.unit_of_work() as uow:
+            service = UserService(
+                UserRepository(uow, None, db.read_session_factory, db.session_factory)
+            )
+            response = await service.create_user("a@example.com", "A", "password")
+
+        assert response.user.email == "a@example.com"
+        assert commits == [1]
+        assert await count_users(db) == 1
+
+    run_with(database(sqlite_urls("primary")), test)
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import List, Optional, Union
+from urllib.parse import urlparse
+
+from utils.cache import LRUCache
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, maxsize: int) -> None:
+        self.cache = LRUCache(maxsize=maxsize)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        self.cache.set(key, value, expires_at=expires_at)
+
+    async def delete(self, key: str) -> None:
+        self.cache.delete(key)
+
+
+class RedisError(Exception):
+    pass
+
+
+class RedisCacheBackend(CacheBackend):
+    def __init__(self, url: str, timeout: float = 1.0) -> None:
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        if ttl:
+            await self.execute("SET", key, value, "EX", ttl)
+        else:
+            await self.execute("SET", key, value)
+
+    async def delete(self, key: str) -> None:
+        await self.execute("DEL", key)
+
+    async def close(self) -> None:
+        self._close()
+
+    async def execute(self, *args: Union[str, bytes, int]):
+        async with self._lock:
+            try:
+                return await asyncio.wait_for(self._execute(*args), self.timeout)
+            except BaseException:
+                # Anything that interrupts a command, cancellation included, can
+                # leave its reply unread; the next command would read it instead.
+                self._close()
+                raise
+
+    def _close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _execute(self, *args: Union[str, bytes, int]):
+        if self._writer is None:
+            await self._connect()
+
+        self._writer.write(self._encode(args))
+        await self._writer.drain()
+        return await self._read_reply()
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        if self.password:
+            self._writer.write(self._encode(("AUTH", self.password)))
+            await self._read_reply()
+        if self.db:
+            self._writer.write(self._encode(("SELECT", self.db)))
+            await self._read_reply()
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, int):
+                arg = str(arg)
+            if isinstance(arg, str):
+                arg = arg.encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def _read_reply(self) -> Union[None, int, bytes, List]:
+        line = await self._reader.readuntil(b"\r\n")
+        prefix, payload = line[:1], line[1:-2]
+
+        if prefix == b"+":
+            return payload
+        if prefix == b"-":
+            raise RedisError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            return (await self._reader.readexactly(length + 2))[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+
+def create_cache_backend(
+    backend: str, maxsize: int, redis_url: Optional[str]
+) -> Optional[CacheBackend]:
+    if backend == "memory":
+        return MemoryCacheBackend(maxsize)
+    if backend == "redis":
+        return RedisCacheBackend(redis_url or "redis://localhost:6379/0")
+    return None
@@ -0,0 +1,131 @@
+import bisect
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Labels = Tuple[str, ...]
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{escape_label_value(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+    suffix = "_total"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        if self.suffix and name.endswith(self.suffix):
+            name = name[: -len(self.suffix)]
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Labels, float] = {}
+
+    @property
+    def family_name(self) -> str:
+        # Text format 0.0.4 names counter families after their _total sample,
+        # as prometheus_client does.
+        return self.name + self.suffix
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[Tuple[str, Labels, Labels, float]]:
+        for labels, value in self.values.items():
+            yield self.family_name, self.labelnames, labels, value
+
+
+class Gauge(Counter):
+    type = "gauge"
+    suffix = ""
+
+    def set(self, *labels: str, value: float) -> None:
+        self.values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    @property
+    def family_name(self) -> str:
+        return self.name
+
+    def observe(self, *labels: str, value: float) -> None:
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def samples(self) -> Iterable[Tuple[str, Labels, Labels, float]]:
+        bucket_labelnames = self.labelnames + ("le",)
+        for labels, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield (
+                    self.name + "_bucket",
+                    bucket_labelnames,
+                    labels + (format_value(bound),),
+                    cumulative,
+                )
+            yield self.name + "_sum", self.labelnames, labels, total[0]
+            yield self.name + "_count", self.labelnames, labels, cumulative
+
+
+def render(metrics: Iterable) -> bytes:
+    lines: List[str] = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.family_name} {metric.help}")
+        lines.append(f"# TYPE {metric.family_name} {metric.type}")
+        for name, labelnames, labels, value in metric.samples():
+            lines.append(
+                f"{name}{format_labels(labelnames, labels)} {format_value(value)}"
+            )
+    lines.append("")
+    return "\n".join(lines).encode()
@@ -0,0 +1,52 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from utils.cache import LRUCache
+
+
+class SingleFlight:
+    def __init__(self, ttl: Optional[float] = None, maxsize: int = 256) -> None:
+        self.ttl = ttl
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.cached = 0
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._results = LRUCache(maxsize=maxsize if ttl else 0)
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+
+        if self.ttl:
+            result = self._results.get(key)
+            if result is not None:
+                self.cached += 1
+                return result
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self.__finish(key, done))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def __finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+        if self.ttl and not task.cancelled() and task.exception() is None:
+            self._results.set(key, task.result(), expires_at=time.time() + self.ttl)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "cached": self.cached,
+            "in_flight": len(self._in_flight),
+        }
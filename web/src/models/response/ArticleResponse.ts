@@ -1,6 +1,9 @@
 import { Article, ArticleShort, Problem } from "../Article";
 
-export type ArticlesResponse = ArticleShort[]
+export type ArticlesResponse = {
+	items: ArticleShort[]
+	next_cursor: string | null
+}
 
 export type ArticleDetailResponse = Article & {
 	user_id: number
@@ -1,7 +1,7 @@
 import { Button, HStack } from "@chakra-ui/react";
 import useAuthStore from "../../stores/authStore";
 import { useNavigate } from "@tanstack/react-router";
-import { useQuery } from "react-query";
+import { useInfiniteQuery } from "react-query";
 import ArticleService from "../../services/ArticleService";
 import ArticleList from "./ArticleList";
 import { Search } from "./Search";
@@ -21,19 +21,26 @@ export const IndexPage = ({ my = false }) => {
   } = my ? {} : Route.useSearch();
 
   const articlesQuery = my
-    ? useQuery("myArticles", ArticleService.getMyArticles, {
-        select: (data) => data.data,
-        enabled: isAuth,
-      })
-    : useQuery(
+    ? useInfiniteQuery(
+        "myArticles",
+        ({ pageParam }) => ArticleService.getMyArticles(pageParam),
+        {
+          getNextPageParam: (lastPage) => lastPage.data.next_cursor ?? undefined,
+          enabled: isAuth,
+        }
+      )
+    : useInfiniteQuery(
         ["articles", searchString],
-        () => ArticleService.getArticles(searchString),
+        ({ pageParam }) => ArticleService.getArticles(searchString, pageParam),
         {
-          select: (data) => data.data,
+          getNextPageParam: (lastPage) => lastPage.data.next_cursor ?? undefined,
           enabled: isAuth,
         }
       );
 
+  const articles =
+    articlesQuery.data?.pages.flatMap((page) => page.data.items) || [];
+
   useEffect(() => {
     const search = {
       term,
@@ -72,7 +79,17 @@ export const IndexPage = ({ my = false }) => {
           queryString={searchString}
         />
       )}
-      <ArticleList articles={articlesQuery.data || []} />
+      <ArticleList articles={articles} />
+      {articlesQuery.hasNextPage && (
+        <HStack justify="center" py="16px">
+          <Button
+            onClick={() => articlesQuery.fetchNextPage()}
+            isLoading={articlesQuery.isFetchingNextPage}
+          >
+            Показать ещё
+          </Button>
+        </HStack>
+      )}
     </>
   );
 };
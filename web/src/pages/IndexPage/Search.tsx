@@ -9,10 +9,11 @@ import {
 } from "@chakra-ui/react";
 import { useNavigate } from "@tanstack/react-router";
 import {
-  QueryObserverResult,
+  InfiniteQueryObserverResult,
   RefetchOptions,
   RefetchQueryFilters,
 } from "react-query";
+import { AxiosResponse } from "axios";
 import { ArticleLang } from "../../models/Article";
 import { useTerms } from "../../utils/hooks/useTerms";
 import { FormEvent, useEffect, useState } from "react";
@@ -23,7 +24,9 @@ import { Route } from "../../routes/";
 type SearchProps = {
   onSearch: <TPageData>(
     options?: (RefetchOptions & RefetchQueryFilters<TPageData>) | undefined
-  ) => Promise<QueryObserverResult<ArticlesResponse, unknown>>;
+  ) => Promise<
+    InfiniteQueryObserverResult<AxiosResponse<ArticlesResponse>, unknown>
+  >;
   queryString: string;
   setQueryString: (q: string) => void;
   isLoading: boolean;
@@ -17,13 +17,13 @@ export default class ArticleService {
         return $api.post(`api/articles/${articleId}/`, {problem: problemText})
     }
 
-    static async getArticles(searchString: string): Promise<AxiosResponse<ArticlesResponse>> {
+    static async getArticles(searchString: string, cursor?: string): Promise<AxiosResponse<ArticlesResponse>> {
         const url = '/api/articles' + (!!searchString ? `?${searchString}` : "")
-        return $api.get(url)
+        return $api.get(url, { params: { cursor } })
     }
 
-    static async getMyArticles(): Promise<AxiosResponse<ArticlesResponse>> {
-        return $api.get('/api/articles/my')
+    static async getMyArticles(cursor?: string): Promise<AxiosResponse<ArticlesResponse>> {
+        return $api.get('/api/articles/my', { params: { cursor } })
     }
 
     static async getTermsByLang(lang: ArticleLang): Promise<AxiosResponse<string[]>> {